@@ -8,7 +8,11 @@ __version__ = "4.1.2"
 __all__ = [
     # Main processing functions
     "convert_document",
+    "convert_many",
+    "MarkdropConverter",
     "ConversionResult",
+    "BatchResult",
+    "read_manifest",
     "markdrop",
     "process_markdown",
     "add_downloadable_tables",
@@ -29,7 +33,11 @@ __all__ = [
 
 _LAZY_IMPORTS: dict[str, tuple[str, str]] = {
     "convert_document": (".conversion", "convert_document"),
+    "convert_many": (".conversion", "convert_many"),
+    "MarkdropConverter": (".conversion", "MarkdropConverter"),
     "ConversionResult": (".conversion", "ConversionResult"),
+    "BatchResult": (".conversion", "BatchResult"),
+    "read_manifest": (".conversion", "read_manifest"),
     "markdrop": (".process", "markdrop"),
     "add_downloadable_tables": (".process", "add_downloadable_tables"),
     "MarkDropConfig": (".config", "MarkDropConfig"),
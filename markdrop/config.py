@@ -7,7 +7,27 @@ class MarkDropConfig:
     """Configuration class for MarkDrop."""
 
     fast: bool = False
+    profile: str = "balanced"
     image_resolution_scale: float = 2.0
+    lazy_page_images: bool = False
+    crop_pixel_budget: int = 0
+    crop_min_dpi: int = 72
+    crop_max_dpi: int = 300
+    embedded_images: bool = False
+    page_cache_size: int = 128
+    preflight_workers: int = 1
+    preflight_strategy: str = "full"
+    preflight_sample_pages: int = 32
+    window_pages: int = 0
+    stage_cache: bool = True
+    cache_dir: str | None = None
+    cache_max_bytes: int = 2 * 1024**3
+    incremental: bool = False
+    hybrid: bool = False
+    asset_format: str = "png"
+    png_compress_level: int = 6
+    asset_quality: int = 90
+    asset_workers: int = 4
     download_button_color: str = "#444444"
     log_level: int = logging.INFO
     log_dir: str = "logs"
@@ -18,6 +18,16 @@ def get_config_dir() -> Path:
         return Path.home() / ".config" / "markdrop"
 
 
+def get_cache_dir() -> Path:
+    """Return the user cache directory for markdrop."""
+    try:
+        import platformdirs
+
+        return Path(platformdirs.user_cache_dir("markdrop"))
+    except ImportError:
+        return Path.home() / ".cache" / "markdrop"
+
+
 def get_env_file_path() -> Path:
     """Return the path to the markdrop .env file."""
     return get_config_dir() / ".env"
@@ -1,4 +1,17 @@
+from .batch import convert_many
+from .blocks import BlockTable
+from .converter import MarkdropConverter
+from .manifest import ManifestReader, read_manifest
 from .pipeline import convert_document
-from .types import ConversionResult
+from .types import BatchResult, ConversionResult
 
-__all__ = ["convert_document", "ConversionResult"]
+__all__ = [
+    "convert_document",
+    "convert_many",
+    "MarkdropConverter",
+    "ManifestReader",
+    "read_manifest",
+    "BatchResult",
+    "BlockTable",
+    "ConversionResult",
+]
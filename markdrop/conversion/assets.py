@@ -0,0 +1,401 @@
+"""Table and picture image export.
+
+Crops are named and numbered on the calling thread, in document order, and
+handed to an ``AssetWriter`` that encodes them on a bounded thread pool (PIL
+releases the GIL while encoding). The format and its quality settings come
+from ``MarkDropConfig``. With ``lazy_page_images``, a ``crop_pixel_budget`` or a
+profile without page images, crops are rendered from the PDF by a
+``PageRasterizer`` instead of being cut from page images Docling kept for the
+whole document. With ``embedded_images``, a picture that is one embedded
+bitmap is written from its original image stream by ``EmbeddedImages`` and
+never rendered; only JPEG 2000 streams are losslessly converted to PNG.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Any
+
+import pymupdf as fitz
+from PIL import Image
+
+from ..config import MarkDropConfig
+from .profiles import docling_profile
+
+logger = logging.getLogger(__name__)
+
+# config.asset_format -> (PIL format, file extension)
+ASSET_FORMATS: dict[str, tuple[str, str]] = {
+    "png": ("PNG", "png"),
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+# extract_image() extension -> file extension for streams written unchanged
+EMBEDDED_EXTENSIONS: dict[str, str] = {"jpeg": "jpg", "png": "png"}
+# Streams decoded and written as PNG: vision providers and `describe` do not accept JPEG 2000.
+TRANSCODED_EXTENSIONS = frozenset({"jpx"})
+# Encodes queued per worker before submit() blocks, bounding the crops held in memory.
+_QUEUE_PER_WORKER = 2
+
+
+def _asset_format(config: MarkDropConfig) -> tuple[str, str]:
+    try:
+        return ASSET_FORMATS[config.asset_format.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown asset format {config.asset_format!r}; expected one of {tuple(ASSET_FORMATS)}"
+        ) from None
+
+
+def asset_extension(config: MarkDropConfig) -> str:
+    return _asset_format(config)[1]
+
+
+def encoder_options(config: MarkDropConfig) -> tuple[str, dict[str, Any]]:
+    """Return the PIL format name and ``Image.save`` keyword arguments for *config*."""
+    pil_format, _extension = _asset_format(config)
+    if pil_format == "PNG":
+        return pil_format, {"compress_level": config.png_compress_level}
+    if pil_format == "WEBP":
+        return pil_format, {"quality": config.asset_quality}
+    return pil_format, {"quality": config.asset_quality, "optimize": True}
+
+
+class AssetWriter:
+    """Write images through a bounded thread pool, or inline when ``asset_workers <= 1``.
+
+    Use as a context manager; leaving it waits for every pending write. A
+    failed write is logged and skipped, like any other element export error,
+    and leaves neither a partial file nor an ``assets`` record.
+    """
+
+    def __init__(self, config: MarkDropConfig):
+        self.format, self.options = encoder_options(config)
+        self.extension = asset_extension(config)
+        self.written = 0
+        # Asset records in submission order; a slot stays None until its file is written.
+        self._records: list[dict[str, Any] | None] = []
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots: threading.BoundedSemaphore | None = None
+        if config.asset_workers > 1:
+            self._pool = ThreadPoolExecutor(
+                max_workers=config.asset_workers, thread_name_prefix="markdrop-assets"
+            )
+            self._slots = threading.BoundedSemaphore(config.asset_workers * _QUEUE_PER_WORKER)
+
+    def __enter__(self) -> AssetWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def assets(self) -> list[dict[str, Any]]:
+        """Records of the files written so far; complete once the writer is closed."""
+        return self.assets_between(0)
+
+    def mark(self) -> int:
+        """Position of the next submission, for ``assets_between``."""
+        return len(self._records)
+
+    def assets_between(self, start: int, stop: int | None = None) -> list[dict[str, Any]]:
+        """Records of the written files among submissions ``start`` to ``stop``."""
+        with self._lock:
+            return [record for record in self._records[start:stop] if record is not None]
+
+    def _write(
+        self,
+        write: Callable[[Any], None],
+        path: Path,
+        record: dict[str, Any] | None,
+        slot: int,
+    ) -> None:
+        try:
+            with path.open("wb") as fp:
+                write(fp)
+        except Exception as exc:
+            logger.error("Error writing %s: %s", path.name, exc)
+            path.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self.written += 1
+            if record is not None:
+                self._records[slot] = {"file": f"{path.parent.name}/{path.name}", **record}
+
+    def _encode(self, image: Any, fp: Any) -> None:
+        if self.format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(fp, self.format, **self.options)
+
+    def _queue(
+        self, write: Callable[[Any], None], path: Path, record: dict[str, Any] | None
+    ) -> None:
+        with self._lock:
+            slot = len(self._records)
+            self._records.append(None)
+        slots = self._slots
+        if self._pool is None or slots is None:
+            self._write(write, path, record, slot)
+            return
+        slots.acquire()
+        future = self._pool.submit(self._write, write, path, record, slot)
+        future.add_done_callback(lambda _future: slots.release())
+
+    def submit(self, image: Any, path: Path, record: dict[str, Any] | None = None) -> None:
+        """Encode *image* to *path*; blocks while the pool's queue is full.
+
+        Once the file is written, *record* (kind, page, dpi, ...) appears in
+        ``assets`` in submission order, with ``file`` set to *path* relative to
+        the output directory. A missing *image* is logged and nothing is written.
+        """
+        if image is None:
+            logger.warning("No image available for %s; skipping", path.name)
+            return
+        self._queue(lambda fp: self._encode(image, fp), path, record)
+
+    def submit_bytes(self, data: bytes, path: Path, record: dict[str, Any] | None = None) -> None:
+        """Write an already encoded image stream to *path* unchanged, like ``submit``."""
+        self._queue(lambda fp: fp.write(data), path, record)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+class PageRasterizer:
+    """Render table and picture crops straight from the PDF with PyMuPDF.
+
+    Without a pixel budget, a page is rendered at ``scale`` the first time one
+    of its elements needs a crop, and only the most recently rendered page is
+    kept. Docling yields elements in reading order, so each page with tables or
+    pictures is normally rendered once.
+
+    With ``pixel_budget``, no page is rendered: each element is clip-rendered
+    on its own at the DPI that gives its crop about ``pixel_budget`` pixels,
+    clamped to ``[min_dpi, max_dpi]``. Small icons then cost a few thousand
+    pixels, and large charts are not limited by the page scale.
+    """
+
+    def __init__(
+        self,
+        pdf_path: str | Path,
+        scale: float,
+        pixel_budget: int = 0,
+        min_dpi: int = 72,
+        max_dpi: int = 300,
+    ):
+        self.scale = scale
+        self.pixel_budget = pixel_budget
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.rendered_pages: list[int] = []
+        self.clips = 0
+        self._doc = fitz.open(pdf_path)
+        self._page_no: int | None = None
+        self._image: Image.Image | None = None
+
+    def __enter__(self) -> PageRasterizer:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _render(self, page_no: int) -> Image.Image:
+        if page_no != self._page_no or self._image is None:
+            self.release()
+            matrix = fitz.Matrix(self.scale, self.scale)
+            pixmap = self._doc[page_no - 1].get_pixmap(matrix=matrix, alpha=False)
+            self._image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+            self._page_no = page_no
+            self.rendered_pages.append(page_no)
+        return self._image
+
+    def crop(self, page_no: int, bbox: tuple[float, float, float, float]) -> Image.Image:
+        """Return the region *bbox* (PDF points, top-left origin) of 1-based *page_no*."""
+        image = self._render(page_no)
+        x0, y0, x1, y1 = (round(value * self.scale) for value in bbox)
+        return image.crop((max(x0, 0), max(y0, 0), min(x1, image.width), min(y1, image.height)))
+
+    def dpi_for(self, bbox: tuple[float, float, float, float]) -> int:
+        """DPI at which *bbox* renders to about ``pixel_budget`` pixels, within the bounds."""
+        area_inches = max(bbox[2] - bbox[0], 1.0) * max(bbox[3] - bbox[1], 1.0) / 72**2
+        dpi = math.sqrt(self.pixel_budget / area_inches)
+        return int(min(max(dpi, self.min_dpi), self.max_dpi))
+
+    def clip(self, page_no: int, bbox: tuple[float, float, float, float], dpi: int) -> Image.Image:
+        """Render only *bbox* of 1-based *page_no* at *dpi*."""
+        pixmap = self._doc[page_no - 1].get_pixmap(clip=fitz.Rect(bbox), dpi=dpi, alpha=False)
+        self.clips += 1
+        return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+    def render(
+        self, page_no: int, bbox: tuple[float, float, float, float]
+    ) -> tuple[Image.Image, int, str]:
+        """Return ``(image, dpi, source)`` for an element's crop.
+
+        ``source`` is ``"clip"`` for budgeted clip renders and ``"page"`` for
+        crops of a full page render.
+        """
+        if self.pixel_budget > 0:
+            dpi = self.dpi_for(bbox)
+            return self.clip(page_no, bbox, dpi), dpi, "clip"
+        return self.crop(page_no, bbox), round(72 * self.scale), "page"
+
+    def release(self) -> None:
+        self._image = None
+        self._page_no = None
+
+    def close(self) -> None:
+        self.release()
+        self._doc.close()
+        if self.pixel_budget > 0:
+            logger.info("Clip-rendered %s table and picture crop(s)", self.clips)
+        else:
+            logger.info(
+                "Rasterized %s page(s) for table and picture crops", len(self.rendered_pages)
+            )
+
+
+def _box_iou(a: tuple[float, ...], b: tuple[float, ...]) -> float:
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    inter = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class EmbeddedImages:
+    """Find the embedded bitmap a picture's box shows and return its original stream.
+
+    A picture matches when exactly one image xref is drawn upright (no
+    rotation or flip) on its page with a box overlapping the picture's by at
+    least ``min_iou``. Images with a soft mask are skipped, since their stored
+    stream lacks the transparency; so are formats outside
+    ``EMBEDDED_EXTENSIONS`` and ``TRANSCODED_EXTENSIONS``. Anything unmatched,
+    such as a vector figure, is left to the caller to render. Placements of
+    the most recent page are kept.
+    """
+
+    def __init__(self, pdf_path: str | Path, min_iou: float = 0.9):
+        self.min_iou = min_iou
+        self.extracted = 0
+        self._doc = fitz.open(pdf_path)
+        self._page_no: int | None = None
+        self._placements: list[tuple[int, tuple[float, float, float, float]]] = []
+
+    def __enter__(self) -> EmbeddedImages:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def placements(self, page_no: int) -> list[tuple[int, tuple[float, float, float, float]]]:
+        """``(xref, bbox)`` for every upright image drawn on 1-based *page_no*."""
+        if page_no != self._page_no:
+            placements = []
+            for info in self._doc[page_no - 1].get_image_info(xrefs=True):
+                a, b, c, d, _e, _f = info.get("transform", (0, 1, 1, 0, 0, 0))
+                if info.get("xref") and a > 0 and d > 0 and abs(b) < 1e-3 and abs(c) < 1e-3:
+                    placements.append((info["xref"], tuple(info["bbox"])))
+            self._placements = placements
+            self._page_no = page_no
+        return self._placements
+
+    def match(self, page_no: int, bbox: tuple[float, float, float, float]) -> int | None:
+        """The xref shown at *bbox* on 1-based *page_no*, or ``None``."""
+        placements = self.placements(page_no)
+        xrefs = {xref for xref, rect in placements if _box_iou(rect, bbox) >= self.min_iou}
+        return xrefs.pop() if len(xrefs) == 1 else None
+
+    def extract(
+        self, page_no: int, bbox: tuple[float, float, float, float]
+    ) -> tuple[bytes, str, int] | None:
+        """Return ``(data, extension, dpi)`` for the image at *bbox*, or ``None``.
+
+        ``dpi`` is the image's effective resolution in the box it fills.
+        """
+        xref = self.match(page_no, bbox)
+        if xref is None:
+            return None
+        try:
+            info = self._doc.extract_image(xref)
+        except Exception as exc:
+            logger.debug("Cannot extract image xref %s: %s", xref, exc)
+            return None
+        if not info or info.get("smask"):
+            return None
+        data = info["image"]
+        extension = EMBEDDED_EXTENSIONS.get(info.get("ext", ""))
+        if extension is None:
+            if info.get("ext") not in TRANSCODED_EXTENSIONS:
+                return None
+            data, extension = self._png(xref), "png"
+            if data is None:
+                return None
+        self.extracted += 1
+        dpi = round(info["width"] * 72 / max(bbox[2] - bbox[0], 1.0))
+        return data, extension, dpi
+
+    def _png(self, xref: int) -> bytes | None:
+        try:
+            pixmap = fitz.Pixmap(self._doc, xref)
+            if pixmap.colorspace is not None and pixmap.colorspace.n > 3:
+                pixmap = fitz.Pixmap(fitz.csRGB, pixmap)
+            return pixmap.tobytes("png")
+        except Exception as exc:
+            logger.debug("Cannot convert image xref %s to PNG: %s", xref, exc)
+            return None
+
+    def close(self) -> None:
+        self._doc.close()
+        logger.info("Wrote %s picture(s) from their embedded image streams", self.extracted)
+
+
+def renders_crops_from_pdf(config: MarkDropConfig) -> bool:
+    """Whether crops come from a ``PageRasterizer`` rather than Docling's page images.
+
+    Always true with ``stage_cache`` enabled, so cached Docling documents carry
+    no base64 page or picture images and cache hits crop the same way as misses.
+    """
+    return (
+        config.stage_cache
+        or config.lazy_page_images
+        or config.crop_pixel_budget > 0
+        or not docling_profile(config).page_images
+    )
+
+
+def page_rasterizer(
+    pdf_path: str | Path,
+    config: MarkDropConfig,
+) -> AbstractContextManager[PageRasterizer | None]:
+    """A ``PageRasterizer`` when crops are rendered from the PDF, otherwise ``None``."""
+    if not renders_crops_from_pdf(config):
+        return nullcontext()
+    return PageRasterizer(
+        pdf_path,
+        config.image_resolution_scale,
+        pixel_budget=config.crop_pixel_budget,
+        min_dpi=config.crop_min_dpi,
+        max_dpi=config.crop_max_dpi,
+    )
+
+
+def embedded_images(
+    pdf_path: str | Path,
+    config: MarkDropConfig,
+) -> AbstractContextManager[EmbeddedImages | None]:
+    """An ``EmbeddedImages`` index when ``config.embedded_images`` is set, otherwise ``None``."""
+    if not config.embedded_images:
+        return nullcontext()
+    return EmbeddedImages(pdf_path)
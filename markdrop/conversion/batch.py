@@ -0,0 +1,198 @@
+"""Convert many documents across a pool of long-lived worker processes."""
+
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+import urllib.parse
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from ..config import MarkDropConfig
+from ..utils import is_remote_path
+from .types import BatchResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TASKS_PER_WORKER = 20
+SUMMARY_FILENAME = "batch_summary.json"
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
+
+
+def _read_list_file(list_file: str | Path) -> list[str]:
+    entries: list[str] = []
+    with open(list_file, encoding="utf-8") as handle:
+        for line in handle:
+            entry = line.strip()
+            if entry and not entry.startswith("#"):
+                entries.append(entry)
+    return entries
+
+
+def collect_inputs(
+    sources: Iterable[str],
+    list_file: str | Path | None = None,
+) -> list[str]:
+    """Expand globs, directories (recursively, ``*.pdf``) and a file of paths/URLs.
+
+    Order follows the arguments; duplicates are dropped.
+    """
+    entries = list(sources)
+    if list_file is not None:
+        entries.extend(_read_list_file(list_file))
+
+    inputs: list[str] = []
+    for entry in entries:
+        if is_remote_path(entry):
+            inputs.append(entry)
+        elif _is_glob(entry):
+            inputs.extend(sorted(glob.glob(entry, recursive=True)))
+        elif os.path.isdir(entry):
+            inputs.extend(str(p) for p in sorted(Path(entry).rglob("*.pdf")))
+        else:
+            inputs.append(entry)
+
+    return list(dict.fromkeys(inputs))
+
+
+def _output_name(input_ref: str) -> str:
+    if is_remote_path(input_ref):
+        name = Path(urllib.parse.urlparse(input_ref).path).stem
+    else:
+        name = Path(input_ref).stem
+    return name or "document"
+
+
+def _assign_output_dirs(inputs: list[str], output_dir: Path) -> list[Path]:
+    seen: dict[str, int] = {}
+    dirs: list[Path] = []
+    for input_ref in inputs:
+        name = _output_name(input_ref)
+        seen[name] = seen.get(name, 0) + 1
+        suffix = f"-{seen[name]}" if seen[name] > 1 else ""
+        dirs.append(output_dir / f"{name}{suffix}")
+    return dirs
+
+
+def _convert_one(task: tuple[str, str, MarkDropConfig]) -> dict[str, Any]:
+    # Runs inside a pool worker. Docling converters are cached per process, so
+    # every document after a worker's first reuses its loaded models.
+    from .pipeline import convert_document
+
+    input_ref, doc_output_dir, config = task
+    start = time.time()
+    entry: dict[str, Any] = {
+        "input_path": input_ref,
+        "output_dir": doc_output_dir,
+        "worker_pid": os.getpid(),
+    }
+    try:
+        result = convert_document(input_ref, doc_output_dir, config)
+        entry.update(
+            status="ok",
+            pages=result.manifest.get("stats", {}).get("total_pages", 0),
+            markdown_path=str(result.markdown_path),
+            warnings=len(result.warnings),
+        )
+    except Exception as exc:
+        logger.error("Failed to convert %s: %s", input_ref, exc)
+        entry.update(status="failed", pages=0, error=f"{type(exc).__name__}: {exc}")
+    entry["seconds"] = round(time.time() - start, 3)
+    return entry
+
+
+def _summarize(documents: list[dict[str, Any]], elapsed: float, workers: int) -> dict[str, Any]:
+    succeeded = [d for d in documents if d["status"] == "ok"]
+    pages = sum(d["pages"] for d in succeeded)
+    return {
+        "documents": len(documents),
+        "succeeded": len(succeeded),
+        "failed": len(documents) - len(succeeded),
+        "pages": pages,
+        "workers": workers,
+        "wall_seconds": round(elapsed, 3),
+        "documents_per_minute": round(len(succeeded) * 60 / elapsed, 3) if elapsed else 0.0,
+        "pages_per_second": round(pages / elapsed, 3) if elapsed else 0.0,
+        "failures": [
+            {"input_path": d["input_path"], "error": d.get("error", "")}
+            for d in documents
+            if d["status"] != "ok"
+        ],
+        "results": documents,
+    }
+
+
+def convert_many(
+    inputs: Iterable[str],
+    output_dir: str | Path,
+    config: MarkDropConfig | None = None,
+    workers: int = 1,
+    max_tasks_per_worker: int = DEFAULT_MAX_TASKS_PER_WORKER,
+    list_file: str | Path | None = None,
+) -> BatchResult:
+    """Convert every input into its own subdirectory of *output_dir*.
+
+    *inputs* may mix paths, URLs, globs and directories; *list_file* adds one
+    path or URL per line. Documents are spread over *workers* processes (0 = one
+    per CPU), each recycled after *max_tasks_per_worker* documents to contain
+    leaks (0 or less never recycles). Each document gets its own ``manifest.json``; an aggregate
+    ``batch_summary.json`` with throughput and failures is written at the end.
+    A failing document is recorded and does not stop the batch.
+    """
+    if config is None:
+        config = MarkDropConfig()
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sources = collect_inputs(inputs, list_file)
+    doc_dirs = _assign_output_dirs(sources, output_dir)
+    tasks = [
+        (source, str(doc_dir), config) for source, doc_dir in zip(sources, doc_dirs, strict=True)
+    ]
+
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    logger.info("Converting %s document(s) with %s worker(s)", len(tasks), workers)
+
+    start = time.time()
+    documents: list[dict[str, Any]] = []
+    if workers == 1:
+        for task in tasks:
+            documents.append(_convert_one(task))
+            logger.info("[%s/%s] %s", len(documents), len(tasks), documents[-1]["input_path"])
+    else:
+        # "spawn" keeps Torch/Docling state out of forked children on every platform.
+        context = multiprocessing.get_context("spawn")
+        # Pool rejects maxtasksperchild=0; None keeps workers for the whole batch.
+        max_tasks = max_tasks_per_worker if max_tasks_per_worker > 0 else None
+        with context.Pool(processes=workers, maxtasksperchild=max_tasks) as pool:
+            for entry in pool.imap_unordered(_convert_one, tasks):
+                documents.append(entry)
+                logger.info("[%s/%s] %s", len(documents), len(tasks), entry["input_path"])
+    elapsed = time.time() - start
+
+    order = {source: index for index, source in enumerate(sources)}
+    documents.sort(key=lambda d: order[d["input_path"]])
+    summary = _summarize(documents, elapsed, workers)
+
+    summary_path = output_dir / SUMMARY_FILENAME
+    with summary_path.open("w", encoding="utf-8") as handle:
+        json.dump(summary, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+    logger.info(
+        "Batch finished: %s ok, %s failed in %.2fs",
+        summary["succeeded"],
+        summary["failed"],
+        elapsed,
+    )
+
+    return BatchResult(summary_path=summary_path, summary=summary)
@@ -0,0 +1,221 @@
+"""Columnar block storage.
+
+A ``BlockTable`` keeps every block field in one array per column instead of
+one ``DocumentBlock`` object per block: kinds and sources as ``uint8`` codes,
+pages as ``int32``, confidences as ``float64``, bounding boxes as an ``N x 4``
+array and all text in a single string addressed by offsets. Indexing returns a
+``BlockView``, which reads the same attributes as ``DocumentBlock`` without
+copying the row, so code written against ``DocumentBlock`` works unchanged.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+import numpy as np
+
+from .types import BlockKind, DocumentBlock
+
+KINDS: tuple[BlockKind, ...] = tuple(BlockKind)
+KIND_CODES: dict[BlockKind, int] = {kind: code for code, kind in enumerate(KINDS)}
+NO_PAGE = -1
+
+
+class BlockView:
+    """Read-only ``DocumentBlock``-compatible view of one ``BlockTable`` row."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: BlockTable, row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def kind(self) -> BlockKind:
+        return KINDS[self._table.kinds[self._row]]
+
+    @property
+    def text(self) -> str:
+        return self._table.text(self._row)
+
+    @property
+    def page(self) -> int | None:
+        page = int(self._table.pages[self._row])
+        return None if page == NO_PAGE else page
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float] | None:
+        return self._table.bbox(self._row)
+
+    @property
+    def source(self) -> str:
+        return self._table.source_names[self._table.sources[self._row]]
+
+    @property
+    def confidence(self) -> float:
+        return float(self._table.confidences[self._row])
+
+    def to_block(self) -> DocumentBlock:
+        return DocumentBlock(
+            kind=self.kind,
+            text=self.text,
+            page=self.page,
+            bbox=self.bbox,
+            source=self.source,
+            confidence=self.confidence,
+        )
+
+    def __repr__(self) -> str:
+        return f"BlockView({self.to_block()!r})"
+
+
+# Anything exposing DocumentBlock's attributes: the dataclass itself or a table row.
+Block = DocumentBlock | BlockView
+
+
+class BlockTableBuilder:
+    """Append blocks row by row into typed buffers, then ``build()`` a table once."""
+
+    def __init__(self) -> None:
+        self._kinds = array("B")
+        self._pages = array("i")
+        self._sources = array("B")
+        self._confidences = array("d")
+        self._bboxes = array("d")
+        self._offsets = array("q", [0])
+        self._texts: list[str] = []
+        self._source_codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def append(
+        self,
+        kind: BlockKind,
+        text: str,
+        page: int | None = None,
+        bbox: Sequence[float] | None = None,
+        source: str = "docling",
+        confidence: float = 1.0,
+    ) -> None:
+        source_code = self._source_codes.setdefault(source, len(self._source_codes))
+        self._kinds.append(KIND_CODES[kind])
+        self._pages.append(NO_PAGE if page is None else page)
+        self._sources.append(source_code)
+        self._confidences.append(confidence)
+        self._bboxes.extend(bbox if bbox else (math.nan,) * 4)
+        self._texts.append(text)
+        self._offsets.append(self._offsets[-1] + len(text))
+
+    def extend(self, blocks: Iterable[Block]) -> None:
+        for block in blocks:
+            self.append(
+                block.kind, block.text, block.page, block.bbox, block.source, block.confidence
+            )
+
+    def build(self) -> BlockTable:
+        count = len(self._kinds)
+        return BlockTable(
+            kinds=np.frombuffer(self._kinds, dtype=np.uint8).copy(),
+            pages=np.frombuffer(self._pages, dtype=np.int32).copy(),
+            sources=np.frombuffer(self._sources, dtype=np.uint8).copy(),
+            confidences=np.frombuffer(self._confidences, dtype=np.float64).copy(),
+            bboxes=np.frombuffer(self._bboxes, dtype=np.float64).reshape(count, 4).copy(),
+            text="".join(self._texts),
+            offsets=np.frombuffer(self._offsets, dtype=np.int64).copy(),
+            source_names=tuple(self._source_codes),
+        )
+
+
+class BlockTable(Sequence[BlockView]):
+    """Blocks stored column-wise; see the module docstring for the layout."""
+
+    def __init__(
+        self,
+        kinds: np.ndarray,
+        pages: np.ndarray,
+        sources: np.ndarray,
+        confidences: np.ndarray,
+        bboxes: np.ndarray,
+        text: str,
+        offsets: np.ndarray,
+        source_names: tuple[str, ...],
+    ):
+        self.kinds = kinds
+        self.pages = pages
+        self.sources = sources
+        self.confidences = confidences
+        self.bboxes = bboxes
+        self._text = text
+        self.offsets = offsets
+        self.source_names = source_names
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[Block]) -> BlockTable:
+        """Build a table from ``DocumentBlock``s, views or any iterator of them."""
+        builder = BlockTableBuilder()
+        builder.extend(blocks)
+        return builder.build()
+
+    @classmethod
+    def concat(cls, tables: Iterable[BlockTable]) -> BlockTable:
+        builder = BlockTableBuilder()
+        for table in tables:
+            builder.extend(table)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @overload
+    def __getitem__(self, row: int) -> BlockView: ...
+
+    @overload
+    def __getitem__(self, row: slice) -> BlockTable: ...
+
+    def __getitem__(self, row: int | slice) -> BlockView | BlockTable:
+        if isinstance(row, slice):
+            return self.take(np.arange(len(self))[row])
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("block index out of range")
+        return BlockView(self, row)
+
+    def __iter__(self) -> Iterator[BlockView]:
+        for row in range(len(self)):
+            yield BlockView(self, row)
+
+    def __repr__(self) -> str:
+        return f"BlockTable({len(self)} blocks, {self.nbytes} bytes)"
+
+    def text(self, row: int, limit: int | None = None) -> str:
+        """Return the text of *row*, or only its first *limit* characters."""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._text[start:end]
+
+    def bbox(self, row: int) -> tuple[float, float, float, float] | None:
+        box = self.bboxes[row]
+        if np.isnan(box[0]):
+            return None
+        return (float(box[0]), float(box[1]), float(box[2]), float(box[3]))
+
+    def take(self, rows: Sequence[int] | np.ndarray) -> BlockTable:
+        """Return a new table holding *rows* in the given order."""
+        builder = BlockTableBuilder()
+        builder.extend(BlockView(self, int(row)) for row in rows)
+        return builder.build()
+
+    def to_blocks(self) -> list[DocumentBlock]:
+        return [view.to_block() for view in self]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.kinds, self.pages, self.sources, self.confidences, self.bboxes, self.offsets)
+        return sum(column.nbytes for column in arrays) + sys.getsizeof(self._text)
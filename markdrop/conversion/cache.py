@@ -0,0 +1,176 @@
+"""Content-addressed on-disk cache for expensive conversion stages."""
+
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from .blocks import Block, BlockTable, BlockTableBuilder
+from .types import BlockKind, PageClassification, PageKind, PreflightResult
+
+logger = logging.getLogger(__name__)
+
+# Bump when a cached stage's format or meaning changes.
+CACHE_FORMAT_VERSION = 2
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024**3
+_HASH_CHUNK = 1024 * 1024
+
+
+def package_version(name: str) -> str:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def file_digest(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stage_key(*parts: Any) -> str:
+    payload = json.dumps([CACHE_FORMAT_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def blocks_to_json(blocks: Iterable[Block]) -> list[dict[str, Any]]:
+    return [
+        {
+            "kind": block.kind.value,
+            "text": block.text,
+            "page": block.page,
+            "bbox": list(block.bbox) if block.bbox else None,
+            "source": block.source,
+            "confidence": block.confidence,
+        }
+        for block in blocks
+    ]
+
+
+def blocks_from_json(items: Iterable[dict[str, Any]]) -> BlockTable:
+    table = BlockTableBuilder()
+    for item in items:
+        table.append(
+            kind=BlockKind(item["kind"]),
+            text=item["text"],
+            page=item["page"],
+            bbox=item["bbox"],
+            source=item["source"],
+            confidence=item["confidence"],
+        )
+    return table.build()
+
+
+def preflight_to_json(preflight: PreflightResult) -> dict[str, Any]:
+    return dataclasses.asdict(preflight)
+
+
+def preflight_from_json(data: dict[str, Any]) -> PreflightResult:
+    fields = dict(data)
+    classifications = [
+        PageClassification(**{**item, "kind": PageKind(item["kind"])})
+        for item in fields.pop("page_classifications")
+    ]
+    return PreflightResult(page_classifications=classifications, **fields)
+
+
+class StageCache:
+    """Gzipped JSON entries under ``root/<stage>/<key>.json.gz`` with LRU eviction.
+
+    Entries are written atomically, so concurrent batch workers or server
+    threads may share one cache directory. Reads refresh an entry's mtime,
+    which eviction uses as its recency order once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.stages: dict[str, str] = {}
+
+    def _entry_path(self, stage: str, key: str) -> Path:
+        return self.root / stage / f"{key}.json.gz"
+
+    def get(self, stage: str, key: str, label: str | None = None) -> Any | None:
+        """Return the cached value or ``None``; the outcome is reported under *label*."""
+        label = label or stage
+        path = self._entry_path(stage, key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                value = json.load(handle)
+        except FileNotFoundError:
+            self.stages[label] = "miss"
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Discarding unreadable cache entry %s: %s", path, exc)
+            path.unlink(missing_ok=True)
+            self.stages[label] = "miss"
+            return None
+
+        os.utime(path)
+        self.stages[label] = "hit"
+        return value
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        """Store *value*; entries larger than ``max_bytes`` on their own are skipped."""
+        path = self._entry_path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as handle:
+                json.dump(value, handle, separators=(",", ":"))
+            size = os.path.getsize(tmp_name)
+            if size > self.max_bytes:
+                logger.warning(
+                    "Not caching %s entry of %s bytes; it exceeds the %s byte cache limit",
+                    stage,
+                    size,
+                    self.max_bytes,
+                )
+                Path(tmp_name).unlink(missing_ok=True)
+                return
+            os.replace(tmp_name, path)
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+        for _mtime, size, path in sorted(entries):
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug("Evicted cache entry %s", path)
+            if total <= self.max_bytes:
+                break
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "enabled": True,
+            "dir": str(self.root),
+            "stages": dict(self.stages),
+            "hits": sum(1 for status in self.stages.values() if status == "hit"),
+            "misses": sum(1 for status in self.stages.values() if status == "miss"),
+        }
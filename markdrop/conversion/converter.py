@@ -0,0 +1,65 @@
+"""Long-lived conversion entry point that keeps Docling models warm."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ..config import MarkDropConfig
+from .pipeline import _convert_document_default, _convert_document_fast
+from .types import ConversionResult
+
+if TYPE_CHECKING:
+    from ..process import DoclingConverterCache
+
+
+class MarkdropConverter:
+    """Reusable converter for services and batch jobs.
+
+    Initialised Docling converters are cached by their effective pipeline
+    options, so only the first ``convert()`` per option set pays for model
+    loading. By default the cache is shared process-wide (the same one used by
+    ``convert_document()``); pass ``docling_converters`` to isolate it.
+    Run conversions from one thread per process. Only the Docling step is
+    serialized; the PyMuPDF session, preflight and crop rendering run on the
+    calling thread, and PyMuPDF is not thread-safe. For parallel conversions
+    use separate processes, as ``convert_many`` and ``markdrop serve`` do.
+    """
+
+    def __init__(
+        self,
+        config: MarkDropConfig | None = None,
+        docling_converters: DoclingConverterCache | None = None,
+    ):
+        self.config = config if config is not None else MarkDropConfig()
+        self._docling_converters = docling_converters
+
+    @property
+    def docling_converters(self) -> DoclingConverterCache:
+        if self._docling_converters is None:
+            from ..process import _SHARED_DOCLING_CONVERTERS
+
+            self._docling_converters = _SHARED_DOCLING_CONVERTERS
+        return self._docling_converters
+
+    def warm_up(self) -> None:
+        """Load Docling models now instead of on the first ``convert()``."""
+        if not self.config.fast:
+            self.docling_converters.get(self.config)
+
+    def convert(
+        self,
+        input_path: str | Path,
+        output_dir: str | Path,
+        page_range: tuple[int, int] | None = None,
+    ) -> ConversionResult:
+        """Convert a PDF (path or URL); see ``convert_document`` for details."""
+        if self.config.fast:
+            return _convert_document_fast(input_path, output_dir, self.config, page_range)
+        return _convert_document_default(
+            input_path,
+            output_dir,
+            self.config,
+            page_range,
+            self.docling_converters,
+        )
@@ -5,32 +5,56 @@ from __future__ import annotations
 import html
 import logging
 from pathlib import Path
+from typing import TextIO
 
-import pymupdf as fitz
-
-from .reconcile import extract_pymupdf_blocks
-from .serialize import write_markdown_from_blocks
-from .types import DoclingConversionResult
+from .reconcile import extract_pymupdf_blocks, iter_pymupdf_blocks
+from .serialize import iter_markdown, write_markdown
+from .session import DocumentSession, resolve_page_range, use_session
+from .types import DoclingConversionResult, DocumentBlock
 
 logger = logging.getLogger(__name__)
 
+_HTML_CHUNK = 1024 * 1024
+
 
-def _markdown_from_pymupdf(input_path: Path) -> str:
+def _write_markdown_from_pymupdf(
+    input_path: Path,
+    session: DocumentSession,
+    page_range: tuple[int, int],
+    handle: TextIO,
+) -> None:
+    first, last = page_range
+    try:
+        import pymupdf4llm  # type: ignore[import-untyped]
+    except ImportError:
+        blocks = iter_pymupdf_blocks(input_path, session=session, page_range=page_range)
+        write_markdown(blocks, handle)
+        return
+    handle.write(pymupdf4llm.to_markdown(session.doc, pages=list(range(first - 1, last))))
+
+
+def _page_markdown_from_pymupdf(
+    session: DocumentSession,
+    pages: list[int],
+    blocks: dict[int, list[DocumentBlock]],
+) -> dict[int, str]:
+    """Markdown for each of *pages*, from one ``pymupdf4llm`` call when available.
+
+    Without ``pymupdf4llm`` the markdown is rendered from the pages' already
+    extracted *blocks*.
+    """
     try:
         import pymupdf4llm  # type: ignore[import-untyped]
 
-        return pymupdf4llm.to_markdown(str(input_path))
+        chunks = pymupdf4llm.to_markdown(
+            session.doc, pages=[page - 1 for page in pages], page_chunks=True
+        )
+        return {page: chunk["text"].strip("\n") for page, chunk in zip(pages, chunks, strict=True)}
     except ImportError:
-        blocks = extract_pymupdf_blocks(input_path)
-        tmp = input_path.parent / f".{input_path.stem}-fast.md"
-        write_markdown_from_blocks(blocks, tmp)
-        content = tmp.read_text(encoding="utf-8")
-        tmp.unlink(missing_ok=True)
-        return content
+        return {page: "\n\n".join(iter_markdown(blocks[page])) for page in pages}
 
 
-def _html_from_markdown(markdown: str, title: str) -> str:
-    body = html.escape(markdown)
+def _html_head(title: str, body_style: str = "white-space:pre-wrap;") -> str:
     return (
         "<!DOCTYPE html>\n"
         '<html lang="en">\n'
@@ -38,21 +62,36 @@ def _html_from_markdown(markdown: str, title: str) -> str:
         '  <meta charset="UTF-8">\n'
         f"  <title>{html.escape(title)}</title>\n"
         "  <style>body{font-family:system-ui,sans-serif;max-width:48rem;margin:2rem auto;"
-        "line-height:1.5;white-space:pre-wrap;}</style>\n"
+        f"line-height:1.5;{body_style}}}</style>\n"
         "</head>\n"
         "<body>\n"
-        f"{body}\n"
-        "</body>\n"
-        "</html>\n"
     )
 
 
-def _export_images(doc: fitz.Document, images_dir: Path, doc_filename: str) -> int:
+def _write_html_from_markdown(md_path: Path, html_path: Path, title: str) -> None:
+    """Escape *md_path* into a preformatted HTML page chunk by chunk."""
+    with (
+        md_path.open("r", encoding="utf-8") as source,
+        html_path.open("w", encoding="utf-8") as target,
+    ):
+        target.write(_html_head(title))
+        for chunk in iter(lambda: source.read(_HTML_CHUNK), ""):
+            target.write(html.escape(chunk))
+        target.write("\n</body>\n</html>\n")
+
+
+def _export_images(
+    session: DocumentSession,
+    images_dir: Path,
+    doc_filename: str,
+    page_range: tuple[int, int],
+) -> int:
     images_dir.mkdir(parents=True, exist_ok=True)
+    doc = session.doc
     counter = 0
     seen: set[int] = set()
 
-    for page in doc:
+    for _page_num, page in session.iter_pages(*page_range):
         for image in page.get_images():
             xref = image[0]
             if xref in seen:
@@ -70,9 +109,68 @@ def _export_images(doc: fitz.Document, images_dir: Path, doc_filename: str) -> i
     return counter
 
 
+def _export_page_images(
+    session: DocumentSession,
+    page_num: int,
+    images_dir: Path,
+    prefix: str,
+) -> int:
+    images_dir.mkdir(parents=True, exist_ok=True)
+    counter = 0
+    for image in session.page(page_num).get_images():
+        xref = image[0]
+        try:
+            extracted = session.doc.extract_image(xref)
+            counter += 1
+            ext = extracted.get("ext", "png")
+            (images_dir / f"{prefix}-picture-{counter}.{ext}").write_bytes(extracted["image"])
+        except Exception as exc:
+            logger.debug("Skipping image xref %s: %s", xref, exc)
+    return counter
+
+
+def fast_html_head(title: str) -> str:
+    """HTML preamble for documents whose pages all came from PyMuPDF."""
+    return _html_head(title, body_style="")
+
+
+def fast_page_fragments(
+    session: DocumentSession,
+    pages: list[int],
+    images_dir: Path,
+    doc_filename: str,
+) -> dict[int, dict]:
+    """Per-page markdown, HTML body, blocks and images for pages routed to PyMuPDF.
+
+    Fragments have the same shape as Docling's (see
+    ``process._convert_pages_with_docling``) so both can be merged in page order.
+    Images are named ``<doc>-page-<n>-picture-<k>.<ext>``.
+    """
+    blocks = {
+        page: extract_pymupdf_blocks(session.input_path, session, page_range=(page, page))
+        for page in pages
+    }
+    markdown = _page_markdown_from_pymupdf(session, pages, blocks) if pages else {}
+    fragments: dict[int, dict] = {}
+    for page in pages:
+        text = markdown[page]
+        fragments[page] = {
+            "markdown": text,
+            "html": f'<div style="white-space:pre-wrap">{html.escape(text)}</div>\n',
+            "blocks": blocks[page],
+            "tables": 0,
+            "pictures": _export_page_images(
+                session, page, images_dir, f"{doc_filename}-page-{page}"
+            ),
+        }
+    return fragments
+
+
 def convert_with_pymupdf(
     input_doc_path: str | Path,
     output_dir: Path,
+    session: DocumentSession | None = None,
+    page_range: tuple[int, int] | None = None,
 ) -> DoclingConversionResult:
     input_path = Path(input_doc_path)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -85,16 +183,13 @@ def convert_with_pymupdf(
     md_filename = output_dir / f"{doc_filename}-markdroped.md"
     html_filename = output_dir / f"{doc_filename}-markdroped.html"
 
-    markdown = _markdown_from_pymupdf(input_path)
-    md_filename.write_text(markdown, encoding="utf-8")
-
-    with fitz.open(input_path) as doc:
-        picture_counter = _export_images(doc, images_dir, doc_filename)
+    with use_session(input_path, session) as active:
+        pages = resolve_page_range(page_range, active.page_count)
+        with md_filename.open("w", encoding="utf-8") as handle:
+            _write_markdown_from_pymupdf(input_path, active, pages, handle)
+        picture_counter = _export_images(active, images_dir, doc_filename, pages)
 
-    html_filename.write_text(
-        _html_from_markdown(markdown, doc_filename),
-        encoding="utf-8",
-    )
+    _write_html_from_markdown(md_filename, html_filename, doc_filename)
 
     logger.info("Fast conversion saved markdown and HTML (PyMuPDF only)")
 
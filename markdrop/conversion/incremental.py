@@ -0,0 +1,224 @@
+"""Page fingerprints and per-page state for incremental re-conversion.
+
+An incremental run stores every page's markdown, HTML body and reconciled
+blocks next to the outputs (``STATE_FILENAME``). The next run against the same
+output directory fingerprints each page, keeps the fragments of pages whose
+fingerprint is unchanged (even if they moved), and converts only the remaining
+pages (see ``paged.convert_by_page``).
+"""
+
+from __future__ import annotations
+
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import pymupdf as fitz
+
+from ..config import MarkDropConfig
+from .cache import package_version, stage_key
+from .reconcile import RECONCILE_VERSION
+from .session import DocumentSession, page_windows
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = ".markdrop-pages.json.gz"
+STATE_VERSION = 1
+_BBOX_PRECISION = 1
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _rounded(bbox: Any) -> list[float]:
+    return [round(float(v), _BBOX_PRECISION) for v in bbox]
+
+
+def page_fingerprint(page: fitz.Page, text_dict: dict[str, Any]) -> dict[str, str]:
+    """Hash a page's text layer, embedded images and vector drawings separately.
+
+    Images are identified by content digest and placement rather than xref
+    number, since xrefs are renumbered whenever a PDF is re-saved.
+    """
+    spans = [
+        [span.get("text", ""), _rounded(span.get("bbox", ()))]
+        for block in text_dict.get("blocks", [])
+        if block.get("type") == 0
+        for line in block.get("lines", [])
+        for span in line.get("spans", [])
+    ]
+    images = sorted(
+        [info["digest"].hex(), _rounded(info["bbox"])] for info in page.get_image_info(hashes=True)
+    )
+    drawings = page.get_cdrawings()
+
+    fingerprint = {
+        "text": _digest(spans),
+        "images": _digest(images),
+        "drawings": _digest(drawings),
+    }
+    fingerprint["digest"] = _digest(fingerprint)
+    return fingerprint
+
+
+def fingerprint_pages(
+    session: DocumentSession,
+    first: int,
+    last: int,
+) -> dict[int, dict[str, str]]:
+    return {
+        page_num: page_fingerprint(page, session.text_dict(page_num, page))
+        for page_num, page in session.iter_pages(first, last)
+    }
+
+
+def plan_pages(
+    fingerprints: dict[int, dict[str, str]],
+    previous: dict[int, dict[str, Any]],
+) -> tuple[dict[int, int], list[int]]:
+    """Match pages to unchanged previous pages; return ``(reused, changed)``.
+
+    ``reused`` maps a new page to the previous page whose fragment it keeps.
+    A page keeps its own previous fragment when that is unchanged; otherwise
+    it takes any unused previous page with the same fingerprint, so inserting
+    or deleting a page does not invalidate everything after it.
+    """
+    by_digest: dict[str, list[int]] = {}
+    for page, entry in sorted(previous.items()):
+        by_digest.setdefault(entry["fingerprint"]["digest"], []).append(page)
+
+    reused: dict[int, int] = {}
+    for page, fingerprint in fingerprints.items():
+        candidates = by_digest.get(fingerprint["digest"], [])
+        if page in candidates:
+            candidates.remove(page)
+            reused[page] = page
+
+    for page, fingerprint in sorted(fingerprints.items()):
+        candidates = by_digest.get(fingerprint["digest"], [])
+        if page not in reused and candidates:
+            reused[page] = candidates.pop(0)
+
+    changed = sorted(page for page in fingerprints if page not in reused)
+    return reused, changed
+
+
+def page_runs(pages: list[int], max_pages: int = 0) -> list[tuple[int, int]]:
+    """Group sorted pages into contiguous inclusive runs of at most *max_pages*."""
+    runs: list[tuple[int, int]] = []
+    for page in pages:
+        if runs and runs[-1][1] == page - 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    if max_pages:
+        runs = [window for run in runs for window in page_windows(*run, max_pages)]
+    return runs
+
+
+def state_key(config: MarkDropConfig, doc_filename: str) -> str:
+    from markdrop.process import _docling_cache_parts
+
+    return stage_key(
+        "incremental",
+        doc_filename,
+        config.hybrid,
+        config.asset_format,
+        config.png_compress_level,
+        config.asset_quality,
+        config.crop_pixel_budget,
+        config.crop_min_dpi,
+        config.crop_max_dpi,
+        config.embedded_images,
+        RECONCILE_VERSION,
+        package_version("pymupdf"),
+        *_docling_cache_parts(config),
+    )
+
+
+def load_state(output_dir: Path, key: str) -> tuple[dict[int, dict[str, Any]], str | None]:
+    """Return ``(pages, html_head)`` from a previous run, or empty state if unusable."""
+    path = output_dir / STATE_FILENAME
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except FileNotFoundError:
+        return {}, None
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable incremental state %s: %s", path, exc)
+        return {}, None
+
+    if data.get("version") != STATE_VERSION or data.get("key") != key:
+        logger.info("Conversion settings changed since the last run; converting every page")
+        return {}, None
+    return {int(page): entry for page, entry in data["pages"].items()}, data.get("html_head")
+
+
+def save_state(
+    output_dir: Path,
+    key: str,
+    pages: dict[int, dict[str, Any]],
+    html_head: str | None,
+) -> None:
+    state = {
+        "version": STATE_VERSION,
+        "key": key,
+        "html_head": html_head,
+        "pages": {str(page): entry for page, entry in sorted(pages.items())},
+    }
+    path = output_dir / STATE_FILENAME
+    fd, tmp_name = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as handle:
+            json.dump(state, handle, separators=(",", ":"))
+        os.replace(tmp_name, path)
+    except Exception:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _page_assets(directories: list[Path], doc_filename: str, page: int) -> list[Path]:
+    return [
+        path
+        for directory in directories
+        for path in directory.glob(f"{glob.escape(doc_filename)}-page-{page}-*")
+    ]
+
+
+def relocate_page_assets(
+    directories: list[Path],
+    doc_filename: str,
+    reused: dict[int, int],
+    previous_pages: list[int],
+) -> None:
+    """Rename kept pages' crops to their new page numbers and delete the rest.
+
+    Renames go through temporary names first, so a page shifting onto another
+    kept page's number never overwrites that page's files.
+    """
+    kept = {old: new for new, old in reused.items()}
+    staged: list[tuple[Path, Path]] = []
+    for old in previous_pages:
+        new = kept.get(old)
+        if new == old:
+            continue
+        prefix = f"{doc_filename}-page-{old}-"
+        for path in _page_assets(directories, doc_filename, old):
+            if new is None:
+                path.unlink(missing_ok=True)
+                continue
+            temp = path.with_name(f".moving-{path.name}")
+            path.rename(temp)
+            final = path.with_name(f"{doc_filename}-page-{new}-{path.name[len(prefix) :]}")
+            staged.append((temp, final))
+
+    for temp, final in staged:
+        temp.rename(final)
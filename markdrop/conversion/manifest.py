@@ -0,0 +1,172 @@
+"""Conversion manifest: a small JSON header plus a line-delimited block sidecar.
+
+``manifest.json`` holds run metadata (paths, timings, warnings, page
+classifications, stats) and, under ``blocks``, a reference to
+``manifest.blocks.jsonl``: one compact JSON object per block, in document
+order. The header's page index stores ``[page, byte_offset, count]`` runs so a
+reader can seek straight to one page's blocks without parsing the others.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from .blocks import Block
+
+MANIFEST_VERSION = 2
+MANIFEST_FILENAME = "manifest.json"
+BLOCKS_FILENAME = "manifest.blocks.jsonl"
+TEXT_PREVIEW_CHARS = 120
+
+
+def _block_record(block: Block) -> dict[str, Any]:
+    return {
+        "kind": block.kind.value,
+        "page": block.page,
+        "bbox": [round(value, 2) for value in block.bbox] if block.bbox else None,
+        "source": block.source,
+        "confidence": block.confidence,
+        "text_preview": block.text[:TEXT_PREVIEW_CHARS],
+    }
+
+
+def _replace_atomically(path: Path, write: Callable[[IO[bytes]], None]) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write(handle)
+        os.replace(tmp_name, path)
+    except Exception:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_block_sidecar(output_dir: Path, blocks: Iterable[Block]) -> dict[str, Any]:
+    """Stream *blocks* to the sidecar as JSON lines; return the header's ``blocks`` entry.
+
+    *blocks* may be a generator; only one block is held at a time.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / BLOCKS_FILENAME
+    runs: list[list[int]] = []
+    count = 0
+
+    def write(handle: IO[bytes]) -> None:
+        nonlocal count
+        offset = 0
+        for block in blocks:
+            line = (json.dumps(_block_record(block), separators=(",", ":")) + "\n").encode()
+            if block.page is not None:
+                if runs and runs[-1][0] == block.page and runs[-1][1] + runs[-1][3] == offset:
+                    runs[-1][2] += 1
+                    runs[-1][3] += len(line)
+                else:
+                    runs.append([block.page, offset, 1, len(line)])
+            handle.write(line)
+            offset += len(line)
+            count += 1
+
+    _replace_atomically(path, write)
+    return {
+        "file": path.name,
+        "count": count,
+        "pages": [[page, offset, run_count] for page, offset, run_count, _size in runs],
+    }
+
+
+def write_manifest(
+    output_dir: Path,
+    manifest: dict[str, Any],
+    blocks_index: dict[str, Any],
+) -> Path:
+    """Write ``manifest.json`` referencing a sidecar from ``write_block_sidecar``.
+
+    ``manifest`` is updated in place with ``manifest_version`` and the
+    ``blocks`` index, so callers can return the same header they wrote.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest["manifest_version"] = MANIFEST_VERSION
+    manifest["blocks"] = blocks_index
+
+    manifest_path = output_dir / MANIFEST_FILENAME
+
+    def write(handle: IO[bytes]) -> None:
+        handle.write(json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+        handle.write(b"\n")
+
+    _replace_atomically(manifest_path, write)
+    return manifest_path
+
+
+class ManifestReader:
+    """Read a manifest header eagerly and its blocks lazily.
+
+    Version 1 manifests, which inline every block in ``manifest.json``, are
+    read through the same interface.
+    """
+
+    def __init__(self, path: str | Path):
+        path = Path(path)
+        self.path = path / MANIFEST_FILENAME if path.is_dir() else path
+        with self.path.open("r", encoding="utf-8") as handle:
+            self.header: dict[str, Any] = json.load(handle)
+        self.version = int(self.header.get("manifest_version", 1))
+
+    def __getitem__(self, key: str) -> Any:
+        return self.header[key]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return self.header.get("stats", {})
+
+    @property
+    def block_count(self) -> int:
+        if self.version == 1:
+            return len(self.header.get("blocks", []))
+        return int(self.header["blocks"]["count"])
+
+    @property
+    def blocks_path(self) -> Path | None:
+        if self.version == 1:
+            return None
+        return self.path.with_name(self.header["blocks"]["file"])
+
+    def pages(self) -> list[int]:
+        """Pages that have at least one block, in ascending order."""
+        if self.version == 1:
+            return sorted({b["page"] for b in self.header.get("blocks", []) if b["page"]})
+        return sorted({run[0] for run in self.header["blocks"]["pages"]})
+
+    def iter_blocks(self, page: int | None = None) -> Iterator[dict[str, Any]]:
+        """Yield block records in document order, optionally only those of *page*.
+
+        Without *page* the sidecar is streamed line by line; with *page* only
+        that page's byte ranges are read.
+        """
+        if self.version == 1:
+            for record in self.header.get("blocks", []):
+                if page is None or record.get("page") == page:
+                    yield record
+            return
+
+        with self.path.with_name(self.header["blocks"]["file"]).open("rb") as handle:
+            if page is None:
+                for line in handle:
+                    yield json.loads(line)
+                return
+            for run_page, offset, count in self.header["blocks"]["pages"]:
+                if run_page != page:
+                    continue
+                handle.seek(offset)
+                for _ in range(count):
+                    yield json.loads(handle.readline())
+
+
+def read_manifest(path: str | Path) -> ManifestReader:
+    """Open ``manifest.json`` (or the directory containing it) for reading."""
+    return ManifestReader(path)
@@ -0,0 +1,213 @@
+"""Page-by-page conversion used by incremental and hybrid modes.
+
+Each page becomes a fragment (markdown, HTML body, reconciled blocks, crop
+counts and asset records) produced either by Docling or by the PyMuPDF fast path. Fragments are
+merged in page order into the usual ``-markdroped.md``/``.html`` outputs.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ..config import MarkDropConfig
+from .blocks import BlockTable
+from .cache import StageCache, blocks_from_json, blocks_to_json
+from .fast import fast_html_head, fast_page_fragments
+from .incremental import (
+    fingerprint_pages,
+    load_state,
+    page_runs,
+    plan_pages,
+    relocate_page_assets,
+    save_state,
+    state_key,
+)
+from .reconcile import iter_pymupdf_blocks, reconcile_blocks
+from .routing import ROUTE_DOCLING
+from .session import DocumentSession
+from .types import DoclingConversionResult, PagedConversionResult
+
+if TYPE_CHECKING:
+    from ..process import DoclingConverterCache
+
+logger = logging.getLogger(__name__)
+
+
+def _write_outputs(
+    md_path: Path,
+    html_path: Path,
+    pages: dict[int, dict[str, Any]],
+    html_head: str,
+) -> None:
+    from markdrop.process import _brand_html
+
+    ordered = [pages[page] for page in sorted(pages)]
+    markdown = "\n\n".join(entry["markdown"] for entry in ordered if entry["markdown"])
+    md_path.write_text(markdown + "\n", encoding="utf-8")
+
+    with html_path.open("w", encoding="utf-8") as handle:
+        handle.write(html_head)
+        for entry in ordered:
+            handle.write(entry["html"])
+        handle.write("</body>\n</html>\n")
+    _brand_html(html_path)
+
+
+def _moved_asset(asset: dict[str, Any], doc_filename: str, old: int, new: int) -> dict[str, Any]:
+    """An asset record renamed the way ``relocate_page_assets`` renamed its file."""
+    if old == new:
+        return asset
+    old_prefix = f"/{doc_filename}-page-{old}-"
+    new_prefix = f"/{doc_filename}-page-{new}-"
+    return {**asset, "file": asset["file"].replace(old_prefix, new_prefix, 1), "page": new}
+
+
+def convert_by_page(
+    session: DocumentSession,
+    input_path: str | Path,
+    output_dir: Path,
+    config: MarkDropConfig,
+    pages: tuple[int, int],
+    timings: dict[str, float],
+    docling_converters: DoclingConverterCache,
+    routes: dict[int, tuple[str, str]] | None = None,
+    stage_cache: StageCache | None = None,
+    pdf_digest: str | None = None,
+) -> PagedConversionResult:
+    """Convert ``pages`` fragment by fragment and merge them in page order.
+
+    With ``config.incremental``, pages unchanged since the previous run into
+    *output_dir* are reused instead of converted. With *routes*, pages routed
+    ``"fast"`` are extracted with PyMuPDF; all other pages go through Docling.
+    Docling models are only loaded if some page needs them.
+    """
+    from markdrop.process import _convert_pages_with_docling, _prepare_output_dirs
+
+    doc_filename = Path(input_path).stem
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tables_dir, images_dir = _prepare_output_dirs(output_dir, config)
+
+    previous: dict[int, dict[str, Any]] = {}
+    fingerprints: dict[int, dict[str, str]] = {}
+    html_head = None
+    key = ""
+    if config.incremental:
+        key = state_key(config, doc_filename)
+        previous, html_head = load_state(output_dir, key)
+        fingerprint_start = time.time()
+        fingerprints = fingerprint_pages(session, *pages)
+        reused, changed = plan_pages(fingerprints, previous)
+        timings["fingerprint_seconds"] = round(time.time() - fingerprint_start, 3)
+        logger.info(
+            "Incremental conversion: %s page(s) unchanged, %s to convert",
+            len(reused),
+            len(changed),
+        )
+        relocate_page_assets([tables_dir, images_dir], doc_filename, reused, sorted(previous))
+    else:
+        reused, changed = {}, list(range(pages[0], pages[1] + 1))
+
+    docling_pages = [p for p in changed if routes is None or routes[p][0] == ROUTE_DOCLING]
+    fast_pages = [p for p in changed if routes is not None and routes[p][0] != ROUTE_DOCLING]
+    runs = page_runs(docling_pages, config.window_pages)
+
+    fast_start = time.time()
+    fragments = fast_page_fragments(session, fast_pages, images_dir, doc_filename)
+    if fast_pages:
+        timings["pymupdf_seconds"] = round(time.time() - fast_start, 3)
+
+    docling_start = time.time()
+    docling_fragments: dict[int, dict[str, Any]] = {}
+    if runs:
+        docling_fragments, converted_head = _convert_pages_with_docling(
+            str(input_path),
+            output_dir,
+            config,
+            runs,
+            converter_factory=docling_converters.factory(config, timings),
+            stage_cache=stage_cache,
+            pdf_digest=pdf_digest,
+        )
+        html_head = converted_head or html_head
+    timings["docling_seconds"] = round(time.time() - docling_start, 3)
+
+    reconcile_start = time.time()
+    state: dict[int, dict[str, Any]] = {}
+    for page, old in reused.items():
+        entry = dict(previous[old])
+        entry["blocks"] = [{**block, "page": page} for block in entry["blocks"]]
+        entry["assets"] = [
+            _moved_asset(asset, doc_filename, old, page) for asset in entry.get("assets", [])
+        ]
+        state[page] = entry
+    for page, fragment in fragments.items():
+        state[page] = {
+            "route": "fast",
+            "markdown": fragment["markdown"],
+            "html": fragment["html"],
+            "blocks": blocks_to_json(fragment["blocks"]),
+            "docling_blocks": 0,
+            "pymupdf_blocks": len(fragment["blocks"]),
+            "tables": fragment["tables"],
+            "pictures": fragment["pictures"],
+            "assets": fragment.get("assets", []),
+        }
+    for page, fragment in docling_fragments.items():
+        pymupdf_blocks = BlockTable.from_blocks(
+            iter_pymupdf_blocks(session.input_path, session=session, page_range=(page, page))
+        )
+        state[page] = {
+            "route": "docling",
+            "markdown": fragment["markdown"],
+            "html": fragment["html"],
+            "blocks": blocks_to_json(reconcile_blocks(fragment["docling_blocks"], pymupdf_blocks)),
+            "docling_blocks": len(fragment["docling_blocks"]),
+            "pymupdf_blocks": len(pymupdf_blocks),
+            "tables": fragment["tables"],
+            "pictures": fragment["pictures"],
+            "assets": fragment.get("assets", []),
+        }
+    for page, entry in state.items():
+        if page in fingerprints:
+            entry["fingerprint"] = fingerprints[page]
+    timings["reconcile_seconds"] = round(time.time() - reconcile_start, 3)
+
+    md_path = output_dir / f"{doc_filename}-markdroped.md"
+    html_path = output_dir / f"{doc_filename}-markdroped.html"
+    _write_outputs(md_path, html_path, state, html_head or fast_html_head(doc_filename))
+    if config.incremental:
+        save_state(output_dir, key, state, html_head)
+
+    ordered = [state[page] for page in sorted(state)]
+    reconciled = blocks_from_json(block for entry in ordered for block in entry["blocks"])
+    incremental: dict[str, Any] = {"enabled": False}
+    if config.incremental:
+        incremental = {
+            "enabled": True,
+            "previous_pages": len(previous),
+            "reused_pages": len(reused),
+            "moved_pages": sorted(page for page, old in reused.items() if page != old),
+            "converted_pages": changed,
+        }
+    return PagedConversionResult(
+        docling_result=DoclingConversionResult(
+            doc_filename=doc_filename,
+            md_path=md_path,
+            html_path=html_path,
+            conv_res=None,
+            tables_dir=tables_dir,
+            images_dir=images_dir,
+            table_counter=sum(entry["tables"] for entry in ordered),
+            picture_counter=sum(entry["pictures"] for entry in ordered),
+            assets=[asset for entry in ordered for asset in entry.get("assets", [])],
+        ),
+        reconciled_blocks=reconciled,
+        docling_block_count=sum(entry["docling_blocks"] for entry in ordered),
+        pymupdf_block_count=sum(entry["pymupdf_blocks"] for entry in ordered),
+        runs=runs,
+        fingerprints=fingerprints,
+        incremental=incremental,
+    )
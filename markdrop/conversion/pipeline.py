@@ -1,21 +1,42 @@
 from __future__ import annotations
 
-import json
 import logging
 import tempfile
 import time
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from ..config import MarkDropConfig
+from ..config_paths import get_cache_dir
 from ..utils import cleanup_download_dir, download_pdf, is_remote_path
+from .blocks import BlockTable
+from .cache import (
+    StageCache,
+    blocks_from_json,
+    blocks_to_json,
+    file_digest,
+    package_version,
+    preflight_from_json,
+    preflight_to_json,
+    stage_key,
+)
+from .manifest import write_block_sidecar, write_manifest
+from .paged import convert_by_page
 from .preflight import analyze_pdf
-from .reconcile import extract_docling_blocks, extract_pymupdf_blocks, reconcile_blocks
+from .reconcile import RECONCILE_VERSION, iter_pymupdf_blocks, reconcile_blocks
+from .routing import route_pages, routing_summary
 from .serialize import wrap_docling_markdown, write_markdown_from_blocks
-from .types import ConversionResult
+from .session import DocumentSession, page_windows, resolve_page_range
+from .types import ConversionResult, DoclingConversionResult, PreflightResult
+
+if TYPE_CHECKING:
+    from ..process import DoclingConverterCache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 LOW_CONFIDENCE_THRESHOLD = 0.5
 
 
@@ -23,6 +44,7 @@ def _convert_document_fast(
     input_path: str | Path,
     output_dir: str | Path,
     config: MarkDropConfig,
+    page_range: tuple[int, int] | None = None,
 ) -> ConversionResult:
     from .fast import convert_with_pymupdf
 
@@ -45,31 +67,49 @@ def _convert_document_fast(
         else:
             local_input = Path(input_ref)
 
-        preflight_start = time.time()
-        preflight = analyze_pdf(local_input)
-        timings["preflight_seconds"] = round(time.time() - preflight_start, 3)
-        warnings.extend(preflight.warnings)
-
-        scanned = sum(1 for p in preflight.page_classifications if p.kind.value == "scanned")
-        if scanned:
-            warnings.append(
-                f"{scanned} page(s) look scanned; fast mode has no OCR — use default mode for those."
+        with DocumentSession(local_input, config.page_cache_size) as session:
+            pages = resolve_page_range(page_range, session.page_count)
+            session.reserve(pages[1] - pages[0] + 1)
+            preflight_start = time.time()
+            preflight = analyze_pdf(
+                local_input,
+                session=session,
+                workers=config.preflight_workers,
+                strategy=config.preflight_strategy,
+                sample_pages=config.preflight_sample_pages,
+                page_range=pages,
             )
+            timings["preflight_seconds"] = round(time.time() - preflight_start, 3)
+            warnings.extend(preflight.warnings)
 
-        convert_start = time.time()
-        fast_result = convert_with_pymupdf(local_input, output_dir)
-        timings["pymupdf_seconds"] = round(time.time() - convert_start, 3)
+            scanned = round(preflight.kind_estimates.get("scanned", 0.0) * preflight.total_pages)
+            if scanned:
+                warnings.append(
+                    f"{scanned} page(s) look scanned; fast mode has no OCR — "
+                    "use default mode for those."
+                )
 
-        pymupdf_blocks = extract_pymupdf_blocks(local_input)
+            convert_start = time.time()
+            fast_result = convert_with_pymupdf(
+                local_input, output_dir, session=session, page_range=pages
+            )
+            timings["pymupdf_seconds"] = round(time.time() - convert_start, 3)
+
+            blocks_index = write_block_sidecar(
+                output_dir, iter_pymupdf_blocks(local_input, session=session, page_range=pages)
+            )
+            cache_stats = session.cache_stats()
 
         manifest = {
             "input_path": input_ref,
             "mode": "fast",
+            "page_range": list(pages),
             "output_dir": str(output_dir.resolve()),
             "markdown_path": str(fast_result.md_path.resolve()),
             "html_path": str(fast_result.html_path.resolve()),
             "timings": timings,
             "warnings": warnings,
+            "preflight": _preflight_summary(preflight),
             "page_classifications": [
                 {
                     "page": item.page,
@@ -78,26 +118,17 @@ def _convert_document_fast(
                 }
                 for item in preflight.page_classifications
             ],
-            "blocks": [
-                {
-                    "kind": block.kind.value,
-                    "page": block.page,
-                    "source": block.source,
-                    "confidence": block.confidence,
-                    "text_preview": block.text[:120],
-                }
-                for block in pymupdf_blocks[:200]
-            ],
             "stats": {
                 "total_pages": preflight.total_pages,
-                "pymupdf_blocks": len(pymupdf_blocks),
+                "pymupdf_blocks": blocks_index["count"],
                 "tables_exported": 0,
                 "pictures_exported": fast_result.picture_counter,
+                **cache_stats,
             },
+            "assets": fast_result.assets,
         }
 
-        manifest_path = output_dir / "manifest.json"
-        _write_manifest(manifest_path, manifest)
+        manifest_path = write_manifest(output_dir, manifest, blocks_index)
         logger.info("Wrote conversion manifest to %s", manifest_path)
 
         return ConversionResult(
@@ -112,25 +143,144 @@ def _convert_document_fast(
             cleanup_download_dir(download_dir, verbose=False)
 
 
-def _write_manifest(manifest_path: Path, manifest: dict[str, Any]) -> None:
-    manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    with manifest_path.open("w", encoding="utf-8") as handle:
-        json.dump(manifest, handle, indent=2, sort_keys=True)
-        handle.write("\n")
+def _preflight_summary(preflight: PreflightResult) -> dict[str, Any]:
+    return {
+        "strategy": preflight.strategy,
+        "confidence": preflight.confidence,
+        "kind_estimates": preflight.kind_estimates,
+        "sampled_pages": preflight.sampled_pages,
+        "estimated_pages": preflight.estimated_pages,
+    }
+
+
+def _open_stage_cache(config: MarkDropConfig) -> StageCache | None:
+    if not config.stage_cache:
+        return None
+    root = Path(config.cache_dir) if config.cache_dir else get_cache_dir() / "stages"
+    return StageCache(root, max_bytes=config.cache_max_bytes)
+
+
+def _cached_stage(
+    stage_cache: StageCache | None,
+    stage: str,
+    key_parts: tuple[Any, ...],
+    compute: Callable[[], T],
+    dump: Callable[[T], Any],
+    load: Callable[[Any], T],
+) -> T:
+    if stage_cache is None:
+        return compute()
+
+    key = stage_key(stage, *key_parts)
+    cached = stage_cache.get(stage, key)
+    if cached is not None:
+        return load(cached)
+    value = compute()
+    try:
+        stage_cache.put(stage, key, dump(value))
+    except Exception as exc:
+        logger.warning("Could not write %s stage to cache: %s", stage, exc)
+    return value
 
 
 def convert_document(
     input_path: str | Path,
     output_dir: str | Path,
     config: MarkDropConfig | None = None,
+    page_range: tuple[int, int] | None = None,
 ) -> ConversionResult:
-    if config is None:
-        config = MarkDropConfig()
+    """Convert a PDF (path or URL) to markdown, HTML and ``manifest.json``.
+
+    ``page_range`` restricts conversion to 1-based inclusive ``(first, last)``
+    pages. With ``config.window_pages`` set, Docling converts that many pages at
+    a time and releases each window before the next, so peak memory follows the
+    window size rather than the document length.
 
-    if config.fast:
-        return _convert_document_fast(input_path, output_dir, config)
+    Shorthand for ``MarkdropConverter(config).convert(...)``; Docling models
+    stay loaded in the process between calls.
+    """
+    from .converter import MarkdropConverter
 
-    from markdrop.process import _convert_with_docling
+    return MarkdropConverter(config).convert(input_path, output_dir, page_range=page_range)
+
+
+def _convert_and_reconcile(
+    session: DocumentSession,
+    local_input: Path,
+    output_dir: Path,
+    config: MarkDropConfig,
+    pages: tuple[int, int],
+    docling_range: tuple[int, int] | None,
+    windows: list[tuple[int, int]],
+    timings: dict[str, float],
+    converter_factory: Callable[[], Any],
+    stage_cache: StageCache | None,
+    pdf_digest: str | None,
+) -> tuple[DoclingConversionResult, BlockTable, int, int]:
+    from markdrop.process import (
+        _convert_with_docling,
+        _convert_with_docling_windowed,
+        _docling_cache_parts,
+    )
+
+    docling_start = time.time()
+    if len(windows) > 1:
+        docling_result = _convert_with_docling_windowed(
+            str(local_input),
+            output_dir,
+            config,
+            windows,
+            converter_factory=converter_factory,
+            stage_cache=stage_cache,
+            pdf_digest=pdf_digest,
+        )
+    else:
+        docling_result = _convert_with_docling(
+            str(local_input),
+            output_dir,
+            config,
+            page_range=docling_range,
+            converter_factory=converter_factory,
+            stage_cache=stage_cache,
+            pdf_digest=pdf_digest,
+        )
+    timings["docling_seconds"] = round(time.time() - docling_start, 3)
+
+    reconcile_start = time.time()
+    pymupdf_key = (pdf_digest, pages, package_version("pymupdf"))
+    pymupdf_blocks = _cached_stage(
+        stage_cache,
+        "pymupdf_blocks",
+        pymupdf_key,
+        lambda: BlockTable.from_blocks(
+            iter_pymupdf_blocks(local_input, session=session, page_range=pages)
+        ),
+        blocks_to_json,
+        blocks_from_json,
+    )
+    docling_blocks = docling_result.docling_blocks
+    if docling_blocks is None:
+        docling_blocks = BlockTable.from_blocks([])
+    reconciled_blocks = _cached_stage(
+        stage_cache,
+        "reconciled_blocks",
+        (*pymupdf_key, windows, RECONCILE_VERSION, *_docling_cache_parts(config)),
+        lambda: reconcile_blocks(docling_blocks, pymupdf_blocks),
+        blocks_to_json,
+        blocks_from_json,
+    )
+    timings["reconcile_seconds"] = round(time.time() - reconcile_start, 3)
+    return docling_result, reconciled_blocks, len(docling_blocks), len(pymupdf_blocks)
+
+
+def _convert_document_default(
+    input_path: str | Path,
+    output_dir: str | Path,
+    config: MarkDropConfig,
+    page_range: tuple[int, int] | None,
+    docling_converters: DoclingConverterCache,
+) -> ConversionResult:
+    from markdrop.process import effective_docling_options
 
     input_ref = str(input_path)
     output_dir = Path(output_dir)
@@ -149,30 +299,78 @@ def convert_document(
         else:
             local_input = Path(input_ref)
 
-        preflight_start = time.time()
-        preflight = analyze_pdf(local_input)
-        timings["preflight_seconds"] = round(time.time() - preflight_start, 3)
-        warnings.extend(preflight.warnings)
+        stage_cache = _open_stage_cache(config)
+        pdf_digest = file_digest(local_input) if stage_cache is not None else None
+
+        with DocumentSession(local_input, config.page_cache_size) as session:
+            pages = resolve_page_range(page_range, session.page_count)
+            session.reserve(pages[1] - pages[0] + 1)
+            preflight_start = time.time()
+            preflight = _cached_stage(
+                stage_cache,
+                "preflight",
+                (pdf_digest, pages, config.preflight_strategy, config.preflight_sample_pages),
+                lambda: analyze_pdf(
+                    local_input,
+                    session=session,
+                    workers=config.preflight_workers,
+                    strategy=config.preflight_strategy,
+                    sample_pages=config.preflight_sample_pages,
+                    page_range=pages,
+                ),
+                preflight_to_json,
+                preflight_from_json,
+            )
+            timings["preflight_seconds"] = round(time.time() - preflight_start, 3)
+            warnings.extend(preflight.warnings)
 
-        docling_start = time.time()
-        docling_result = _convert_with_docling(str(local_input), output_dir, config)
-        timings["docling_seconds"] = round(time.time() - docling_start, 3)
+            windows = page_windows(*pages, config.window_pages) if config.window_pages else []
+            routes = route_pages(session, preflight, *pages) if config.hybrid else None
 
-        reconcile_start = time.time()
-        pymupdf_blocks = extract_pymupdf_blocks(local_input)
-        docling_blocks = extract_docling_blocks(docling_result.conv_res)
-        reconciled_blocks = reconcile_blocks(docling_blocks, pymupdf_blocks)
-        timings["reconcile_seconds"] = round(time.time() - reconcile_start, 3)
+            paged = None
+            if config.incremental or routes is not None:
+                paged = convert_by_page(
+                    session,
+                    local_input,
+                    output_dir,
+                    config,
+                    pages,
+                    timings,
+                    docling_converters,
+                    routes=routes,
+                    stage_cache=stage_cache,
+                    pdf_digest=pdf_digest,
+                )
+                docling_result = paged.docling_result
+                reconciled_blocks = paged.reconciled_blocks
+                docling_block_count = paged.docling_block_count
+                pymupdf_block_count = paged.pymupdf_block_count
+                windows = paged.runs
+            else:
+                docling_result, reconciled_blocks, docling_block_count, pymupdf_block_count = (
+                    _convert_and_reconcile(
+                        session,
+                        local_input,
+                        output_dir,
+                        config,
+                        pages,
+                        pages if page_range else None,
+                        windows,
+                        timings,
+                        docling_converters.factory(config, timings),
+                        stage_cache,
+                        pdf_digest,
+                    )
+                )
+            cache_stats = session.cache_stats()
 
-        low_confidence = [b for b in reconciled_blocks if b.confidence < LOW_CONFIDENCE_THRESHOLD]
+        low_confidence = int((reconciled_blocks.confidences < LOW_CONFIDENCE_THRESHOLD).sum())
         if low_confidence:
-            warnings.append(f"{len(low_confidence)} block(s) have low pymupdf text agreement.")
+            warnings.append(f"{low_confidence} block(s) have low pymupdf text agreement.")
 
         assets_dir = output_dir
         serialize_start = time.time()
-        if reconciled_blocks and all(
-            b.confidence >= LOW_CONFIDENCE_THRESHOLD for b in reconciled_blocks
-        ):
+        if len(reconciled_blocks) and not low_confidence:
             markdown_path = write_markdown_from_blocks(
                 reconciled_blocks,
                 docling_result.md_path,
@@ -186,12 +384,15 @@ def convert_document(
 
         manifest = {
             "input_path": input_ref,
-            "mode": "default",
+            "mode": "hybrid" if routes is not None else "default",
+            "page_range": list(pages),
+            "windows": [list(window) for window in windows],
             "output_dir": str(output_dir.resolve()),
             "markdown_path": str(markdown_path.resolve()),
             "html_path": str(docling_result.html_path.resolve()),
             "timings": timings,
             "warnings": warnings,
+            "preflight": _preflight_summary(preflight),
             "page_classifications": [
                 {
                     "page": item.page,
@@ -200,28 +401,31 @@ def convert_document(
                 }
                 for item in preflight.page_classifications
             ],
-            "blocks": [
-                {
-                    "kind": block.kind.value,
-                    "page": block.page,
-                    "source": block.source,
-                    "confidence": block.confidence,
-                    "text_preview": block.text[:120],
-                }
-                for block in reconciled_blocks
-            ],
+            "cache": stage_cache.report() if stage_cache is not None else {"enabled": False},
+            "incremental": paged.incremental if paged is not None else {"enabled": False},
+            "profile": effective_docling_options(config),
+            "routing": routing_summary(routes) if routes is not None else {"enabled": False},
+            "page_fingerprints": [
+                {"page": page, **fingerprint}
+                for page, fingerprint in sorted(paged.fingerprints.items())
+            ]
+            if paged is not None
+            else [],
             "stats": {
                 "total_pages": preflight.total_pages,
-                "docling_blocks": len(docling_blocks),
-                "pymupdf_blocks": len(pymupdf_blocks),
+                "docling_blocks": docling_block_count,
+                "pymupdf_blocks": pymupdf_block_count,
                 "reconciled_blocks": len(reconciled_blocks),
                 "tables_exported": docling_result.table_counter,
                 "pictures_exported": docling_result.picture_counter,
+                **cache_stats,
             },
+            "assets": docling_result.assets,
         }
 
-        manifest_path = output_dir / "manifest.json"
-        _write_manifest(manifest_path, manifest)
+        manifest_path = write_manifest(
+            output_dir, manifest, write_block_sidecar(output_dir, reconciled_blocks)
+        )
         logger.info("Wrote conversion manifest to %s", manifest_path)
 
         return ConversionResult(
@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+import logging
+import math
+import multiprocessing
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
 from pathlib import Path
+from typing import Any
 
 import pymupdf as fitz
 
+from .session import DocumentSession, page_windows, resolve_page_range, use_session
 from .types import PageClassification, PageKind, PreflightResult
 
+logger = logging.getLogger(__name__)
+
 DIGITAL_COVERAGE_THRESHOLD = 0.05
 SCANNED_COVERAGE_THRESHOLD = 0.01
+MIN_PAGES_PER_WORKER = 32
+
+PREFLIGHT_STRATEGIES = ("full", "sampled")
+DEFAULT_SAMPLE_PAGES = 32
+SAMPLE_EDGE_PAGES = 5
+EARLY_EXIT_MIN_SAMPLES = 12
 
 
-def _page_text_coverage(page: fitz.Page) -> float:
+def _page_text_coverage(page: fitz.Page, text_dict: dict[str, Any]) -> float:
     page_area = page.rect.width * page.rect.height
     if page_area <= 0:
         return 0.0
 
     text_area = 0.0
-    for block in page.get_text("dict").get("blocks", []):
+    for block in text_dict.get("blocks", []):
         if block.get("type") != 0:
             continue
         for line in block.get("lines", []):
@@ -27,16 +45,21 @@ def _page_text_coverage(page: fitz.Page) -> float:
     return min(text_area / page_area, 1.0)
 
 
-def _page_has_images(page: fitz.Page) -> bool:
-    blocks = page.get_text("dict").get("blocks", [])
+def _page_has_images(page: fitz.Page, text_dict: dict[str, Any]) -> bool:
+    blocks = text_dict.get("blocks", [])
     if any(block.get("type") == 1 for block in blocks):
         return True
     return bool(page.get_images())
 
 
-def _classify_page(page: fitz.Page, page_num: int) -> PageClassification:
-    coverage = _page_text_coverage(page)
-    has_images = _page_has_images(page)
+def _classify_page(
+    page: fitz.Page,
+    page_num: int,
+    session: DocumentSession,
+) -> PageClassification:
+    text_dict = session.text_dict(page_num, page)
+    coverage = _page_text_coverage(page, text_dict)
+    has_images = _page_has_images(page, text_dict)
 
     if coverage < SCANNED_COVERAGE_THRESHOLD:
         kind = PageKind.SCANNED
@@ -48,21 +71,205 @@ def _classify_page(page: fitz.Page, page_num: int) -> PageClassification:
     return PageClassification(page=page_num, kind=kind, text_coverage=round(coverage, 4))
 
 
-def analyze_pdf(input_path: str | Path) -> PreflightResult:
+def _classify_page_range(input_path: str, start: int, stop: int) -> list[PageClassification]:
+    # Runs in a worker process: each worker opens its own handle, and nothing
+    # is reused afterwards, so the page-text cache is disabled.
+    with DocumentSession(input_path, max_cached_pages=0) as session:
+        return [
+            _classify_page(page, page_num, session)
+            for page_num, page in session.iter_pages(start, stop)
+        ]
+
+
+def _classify_parallel(
+    path: Path,
+    first: int,
+    last: int,
+    workers: int,
+) -> list[PageClassification]:
+    slices = page_windows(first, last, -(-(last - first + 1) // workers))
+    classifications: list[PageClassification] = []
+    # "spawn" keeps Torch/Docling threads and open PyMuPDF handles out of the
+    # workers; forking a process that holds them is unsafe.
+    with ProcessPoolExecutor(
+        max_workers=len(slices), mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(_classify_page_range, str(path), start, stop) for start, stop in slices
+        ]
+        # Slices are contiguous and submitted in order, so page order is preserved.
+        for future in futures:
+            classifications.extend(future.result())
+    return classifications
+
+
+def _resolve_workers(workers: int, total_pages: int) -> int:
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, total_pages // MIN_PAGES_PER_WORKER))
+
+
+def _bisection_order(items: list[int]) -> list[int]:
+    """*items* reordered midpoint first, then the midpoints of each half, and so on."""
+    order: list[int] = []
+    spans = deque([(0, len(items))])
+    while spans:
+        low, high = spans.popleft()
+        if low >= high:
+            continue
+        middle = (low + high) // 2
+        order.append(items[middle])
+        spans.extend(((low, middle), (middle + 1, high)))
+    return order
+
+
+def _sample_order(total_pages: int, sample_pages: int, seed: int) -> list[int]:
+    """Return 1-based offsets to sample: first/last edges and a randomly offset stride.
+
+    The stride is visited in bisection order and interleaved with the edges,
+    so every prefix of the order, and in particular the one early exit
+    stops at, is spread over the whole range rather than its ends.
+    """
+    edge = min(SAMPLE_EDGE_PAGES, max(sample_pages // 4, 1), total_pages)
+    head = list(range(1, edge + 1))
+    tail = list(range(total_pages, max(total_pages - edge, edge), -1))
+
+    interior_budget = max(sample_pages - len(head) - len(tail), 0)
+    interior_first, interior_last = edge + 1, total_pages - edge
+    interior_count = interior_last - interior_first + 1
+    interior: list[int] = []
+    if interior_budget and interior_count > 0:
+        stride = max(interior_count // interior_budget, 1)
+        offset = random.Random(seed).randrange(stride)
+        interior = list(range(interior_first + offset, interior_last + 1, stride))
+        interior = _bisection_order(interior[:interior_budget])
+
+    return [
+        offset
+        for group in zip_longest(head, tail, interior)
+        for offset in group
+        if offset is not None
+    ]
+
+
+def _margin(share: float, sampled: int, total_pages: int) -> float:
+    # 95% margin of error with finite-population correction; for an unobserved
+    # (or universal) kind fall back to the rule of three.
+    if sampled >= total_pages:
+        return 0.0
+    fpc = math.sqrt((total_pages - sampled) / max(total_pages - 1, 1))
+    if share in (0.0, 1.0):
+        return min(3.0 / sampled, 1.0) * fpc
+    return 1.96 * math.sqrt(share * (1.0 - share) / sampled) * fpc
+
+
+def _kind_shares(classifications: list[PageClassification]) -> dict[str, float]:
+    count = len(classifications) or 1
+    return {
+        kind.value: round(sum(1 for c in classifications if c.kind == kind) / count, 4)
+        for kind in PageKind
+    }
+
+
+def _classify_sampled(
+    session: DocumentSession,
+    first: int,
+    last: int,
+    sample_pages: int,
+) -> tuple[list[PageClassification], float]:
+    total_pages = last - first + 1
+    classifications: list[PageClassification] = []
+    for offset in _sample_order(total_pages, sample_pages, seed=total_pages):
+        page_num = first + offset - 1
+        classifications.append(_classify_page(session.page(page_num), page_num, session))
+        kinds = {c.kind for c in classifications}
+        if (
+            len(classifications) >= EARLY_EXIT_MIN_SAMPLES
+            and len(kinds) == 1
+            and kinds != {PageKind.MIXED}
+        ):
+            logger.debug(
+                "Preflight stopped after %s sampled pages: uniformly %s",
+                len(classifications),
+                classifications[0].kind.value,
+            )
+            break
+
+    classifications.sort(key=lambda c: c.page)
+    shares = _kind_shares(classifications)
+    margin = max(_margin(share, len(classifications), total_pages) for share in shares.values())
+    return classifications, round(1.0 - margin, 4)
+
+
+def analyze_pdf(
+    input_path: str | Path,
+    session: DocumentSession | None = None,
+    workers: int = 1,
+    strategy: str = "full",
+    sample_pages: int = DEFAULT_SAMPLE_PAGES,
+    page_range: tuple[int, int] | None = None,
+) -> PreflightResult:
+    """Classify pages as digital, scanned or mixed.
+
+    ``strategy="full"`` classifies every page. With ``workers`` > 1 (or 0 for one
+    per CPU) the page range is split across a spawned process pool; documents
+    too small to amortize process start-up stay serial. Worker processes do not
+    fill *session*'s page-text cache, so a later stage that reads every page
+    (reconciliation, fast mode) extracts the text again: parallel preflight
+    shortens preflight itself but adds one text pass to the whole conversion.
+
+    ``strategy="sampled"`` classifies at most ``sample_pages`` pages (the first
+    and last few plus a randomly offset stride), stops early once the sample is
+    uniformly digital or scanned, and extrapolates the kind split with a
+    confidence estimate. Unsampled pages are listed in ``estimated_pages``.
+
+    ``page_range`` limits analysis to 1-based inclusive ``(first, last)`` pages;
+    ``total_pages`` then counts the pages in that range.
+    """
+    if strategy not in PREFLIGHT_STRATEGIES:
+        raise ValueError(
+            f"Unknown preflight strategy {strategy!r}; expected one of {PREFLIGHT_STRATEGIES}"
+        )
+
     path = Path(input_path)
     warnings: list[str] = []
-    classifications: list[PageClassification] = []
+    confidence = 1.0
+
+    with use_session(path, session) as active:
+        first, last = resolve_page_range(page_range, active.page_count)
+        total_pages = last - first + 1
+        pool_size = _resolve_workers(workers, total_pages) if workers != 1 else 1
+        if strategy == "sampled" and total_pages > sample_pages:
+            classifications, confidence = _classify_sampled(active, first, last, sample_pages)
+        elif pool_size > 1:
+            logger.debug("Classifying %s pages across %s processes", total_pages, pool_size)
+            classifications = _classify_parallel(path, first, last, pool_size)
+        else:
+            classifications = [
+                _classify_page(page, page_num, active)
+                for page_num, page in active.iter_pages(first, last)
+            ]
 
-    with fitz.open(path) as doc:
-        for page_num, page in enumerate(doc, start=1):
-            classifications.append(_classify_page(page, page_num))
+    sampled_pages = [c.page for c in classifications]
+    sampled_set = set(sampled_pages)
+    estimated_pages = [p for p in range(first, last + 1) if p not in sampled_set]
+    kind_estimates = _kind_shares(classifications) if classifications else {}
 
-    scanned_pages = sum(1 for c in classifications if c.kind == PageKind.SCANNED)
-    if scanned_pages == len(classifications) and classifications:
-        warnings.append("All pages appear scanned; OCR quality may vary.")
+    if classifications and kind_estimates.get(PageKind.SCANNED.value) == 1.0:
+        if estimated_pages:
+            warnings.append(
+                f"All {len(sampled_pages)} sampled pages appear scanned; OCR quality may vary."
+            )
+        else:
+            warnings.append("All pages appear scanned; OCR quality may vary.")
 
     return PreflightResult(
         page_classifications=classifications,
-        total_pages=len(classifications),
+        total_pages=total_pages,
         warnings=warnings,
+        strategy="sampled" if estimated_pages else "full",
+        sampled_pages=sampled_pages,
+        estimated_pages=estimated_pages,
+        kind_estimates=kind_estimates,
+        confidence=confidence,
     )
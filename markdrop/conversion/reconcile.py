@@ -1,14 +1,39 @@
 from __future__ import annotations
 
 import re
+import zlib
+from collections.abc import Iterator, Sequence
 from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Any
 
-import pymupdf as fitz
+import numpy as np
 
+from .blocks import Block, BlockTable, BlockTableBuilder
+from .session import DocumentSession, resolve_page_range, use_session
 from .types import BlockKind, DocumentBlock
 
+# Bump when matching changes, so cached reconciled blocks are not reused.
+RECONCILE_VERSION = 4
+SHINGLE_SIZE = 4
+MINHASH_PERMUTATIONS = 32
+SHORTLIST_SIZE = 8
+EXHAUSTIVE_MAX_CANDIDATES = 16
+# Boxes are compared by intersection over the smaller box, so a block nested
+# in a larger one scores as fully overlapping. Docling and PyMuPDF boxes
+# around the same text rarely align exactly; below GEOMETRY_MIN_OVERLAP a
+# Docling block falls back to text matching, and candidates within
+# GEOMETRY_TIE_MARGIN of the best overlap are separated by text similarity.
+GEOMETRY_MIN_OVERLAP = 0.5
+GEOMETRY_TIE_MARGIN = 0.05
+_OVERLAP_CHUNK = 256
+
+# Multiply-shift hashing: uint64 products wrap on purpose and the high 32 bits
+# form each permutation. Multipliers must be odd.
+_MINHASH_RNG = np.random.default_rng(0x6D64)
+_MINHASH_A = _MINHASH_RNG.integers(0, 1 << 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) * 2 + 1
+_MINHASH_B = _MINHASH_RNG.integers(0, 1 << 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
 
 def _normalize_text(text: str) -> str:
     return re.sub(r"\s+", " ", text.strip().lower())
@@ -24,11 +49,23 @@ def _overlap_confidence(docling_text: str, pymupdf_text: str) -> float:
     return SequenceMatcher(None, left, right).ratio()
 
 
-def extract_pymupdf_blocks(input_path: str | Path) -> list[DocumentBlock]:
-    blocks: list[DocumentBlock] = []
-    with fitz.open(Path(input_path)) as doc:
-        for page_num, page in enumerate(doc, start=1):
-            for block in page.get_text("dict").get("blocks", []):
+def extract_pymupdf_blocks(
+    input_path: str | Path,
+    session: DocumentSession | None = None,
+    page_range: tuple[int, int] | None = None,
+) -> list[DocumentBlock]:
+    return list(iter_pymupdf_blocks(input_path, session=session, page_range=page_range))
+
+
+def iter_pymupdf_blocks(
+    input_path: str | Path,
+    session: DocumentSession | None = None,
+    page_range: tuple[int, int] | None = None,
+) -> Iterator[DocumentBlock]:
+    with use_session(Path(input_path), session) as active:
+        first, last = resolve_page_range(page_range, active.page_count)
+        for page_num, page in active.iter_pages(first, last):
+            for block in active.text_dict(page_num, page).get("blocks", []):
                 if block.get("type") != 0:
                     continue
                 lines = []
@@ -40,24 +77,32 @@ def extract_pymupdf_blocks(input_path: str | Path) -> list[DocumentBlock]:
                     continue
                 bbox = block.get("bbox")
                 bbox_tuple = tuple(bbox) if bbox and len(bbox) == 4 else None
-                blocks.append(
-                    DocumentBlock(
-                        kind=BlockKind.PARAGRAPH,
-                        text=text,
-                        page=page_num,
-                        bbox=bbox_tuple,
-                        source="pymupdf",
-                        confidence=1.0,
-                    )
+                yield DocumentBlock(
+                    kind=BlockKind.PARAGRAPH,
+                    text=text,
+                    page=page_num,
+                    bbox=bbox_tuple,
+                    source="pymupdf",
+                    confidence=1.0,
                 )
-    return blocks
 
 
 def extract_docling_blocks(conv_res: Any) -> list[DocumentBlock]:
-    blocks: list[DocumentBlock] = []
-    document = conv_res.document
+    return extract_docling_document_blocks(conv_res.document)
+
 
-    for element, _level in document.iterate_items():
+def extract_docling_document_blocks(
+    document: Any,
+    page_no: int | None = None,
+) -> list[DocumentBlock]:
+    return list(iter_docling_document_blocks(document, page_no=page_no))
+
+
+def iter_docling_document_blocks(
+    document: Any,
+    page_no: int | None = None,
+) -> Iterator[DocumentBlock]:
+    for element, _level in document.iterate_items(page_no=page_no):
         label = getattr(element, "label", None)
         text = getattr(element, "text", "") or ""
         if hasattr(element, "export_to_markdown"):
@@ -86,50 +131,218 @@ def extract_docling_blocks(conv_res: Any) -> list[DocumentBlock]:
         page = getattr(element, "page", None)
         prov = getattr(element, "prov", None)
         if page is None and prov:
-            page = getattr(prov[0], "page", None) if prov else None
-
-        blocks.append(
-            DocumentBlock(
-                kind=kind,
-                text=text.strip(),
-                page=page,
-                source="docling",
-                confidence=1.0,
-            )
+            page = getattr(prov[0], "page_no", None)
+        if page is None:
+            page = page_no
+
+        yield DocumentBlock(
+            kind=kind,
+            text=text.strip(),
+            page=page,
+            bbox=_docling_bbox(document, prov[0]) if prov else None,
+            source="docling",
+            confidence=1.0,
         )
 
-    return blocks
+
+def _docling_bbox(document: Any, prov: Any) -> tuple[float, float, float, float] | None:
+    """Return a provenance box in PyMuPDF's top-left page coordinates."""
+    bbox = getattr(prov, "bbox", None)
+    if bbox is None:
+        return None
+    if "bottom" in str(getattr(bbox, "coord_origin", "")).lower():
+        page = getattr(document, "pages", {}).get(getattr(prov, "page_no", None))
+        size = getattr(page, "size", None)
+        if size is None:
+            return None
+        bbox = bbox.to_top_left_origin(page_height=size.height)
+    return (float(bbox.l), float(bbox.t), float(bbox.r), float(bbox.b))
+
+
+def _overlap_matrix(boxes: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Pairwise intersection over the smaller area of ``(N, 4)`` and ``(M, 4)`` x0/y0/x1/y1 boxes.
+
+    Unlike IoU, a box lying entirely inside a much larger one scores 1.0.
+    """
+    x0 = np.maximum(boxes[:, None, 0], others[None, :, 0])
+    y0 = np.maximum(boxes[:, None, 1], others[None, :, 1])
+    x1 = np.minimum(boxes[:, None, 2], others[None, :, 2])
+    y1 = np.minimum(boxes[:, None, 3], others[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    other_area = (others[:, 2] - others[:, 0]) * (others[:, 3] - others[:, 1])
+    smaller = np.minimum(area[:, None], other_area[None, :])
+    return np.divide(inter, smaller, out=np.zeros_like(inter), where=smaller > 0)
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    # crc32 rather than hash(): str hashes are salted per process (PYTHONHASHSEED),
+    # which would make shortlists, and so the reconciled blocks, vary between runs.
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+
+
+def _minhash(text: str) -> np.ndarray:
+    hashes = _shingle_hashes(text)
+    return ((hashes[:, None] * _MINHASH_A + _MINHASH_B) >> np.uint64(32)).min(axis=0)
+
+
+class _PageIndex:
+    """One page's PyMuPDF blocks, normalized once and indexed by MinHash signature.
+
+    Pages with at most ``EXHAUSTIVE_MAX_CANDIDATES`` blocks are scored
+    exhaustively. Larger pages shortlist the ``SHORTLIST_SIZE`` blocks whose
+    signatures agree most with the query before exact scoring.
+    """
+
+    def __init__(self, blocks: list[Block]):
+        self.blocks = blocks
+        self.texts = [_normalize_text(block.text) for block in blocks]
+        self.signatures = None
+        if len(blocks) > EXHAUSTIVE_MAX_CANDIDATES:
+            self.signatures = np.vstack([_minhash(text) for text in self.texts])
+        self._matchers: dict[int, SequenceMatcher] = {}
+
+        self.boxed = [index for index, block in enumerate(blocks) if block.bbox]
+        self.boxes = np.array([blocks[index].bbox for index in self.boxed], dtype=np.float64)
+
+    def candidates(self, text: str) -> list[int]:
+        if self.signatures is None:
+            return list(range(len(self.blocks)))
+        agreement = (self.signatures == _minhash(text)).sum(axis=1)
+        shortlist = np.argpartition(-agreement, SHORTLIST_SIZE)[:SHORTLIST_SIZE]
+        return sorted(int(index) for index in shortlist)
+
+    def score(self, index: int, text: str) -> float:
+        candidate = self.texts[index]
+        if not text or not candidate:
+            return 1.0 if not text and not candidate else 0.3
+        # The candidate is always the second sequence, as in _overlap_confidence,
+        # so its matcher (and junk analysis) is built once and reused.
+        matcher = self._matchers.get(index)
+        if matcher is None:
+            matcher = self._matchers[index] = SequenceMatcher(None, "", candidate)
+        matcher.set_seq1(text)
+        return matcher.ratio()
+
+    def best_match(
+        self,
+        text: str,
+        candidates: list[int] | None = None,
+    ) -> tuple[Block, float]:
+        best_index, best_score = -1, -1.0
+        for index in self.candidates(text) if candidates is None else candidates:
+            score = self.score(index, text)
+            if score > best_score:
+                best_index, best_score = index, score
+        return self.blocks[best_index], best_score
+
+    def overlaps(self, boxes: np.ndarray) -> list[list[int]]:
+        """Return, per query box, the blocks within the tie margin of its best overlap.
+
+        Candidates are ordered by decreasing overlap; an empty list means no
+        block overlaps by at least ``GEOMETRY_MIN_OVERLAP``.
+        """
+        if not len(self.boxed) or not len(boxes):
+            return [[] for _ in range(len(boxes))]
+        matches: list[list[int]] = []
+        for start in range(0, len(boxes), _OVERLAP_CHUNK):
+            overlap = _overlap_matrix(boxes[start : start + _OVERLAP_CHUNK], self.boxes)
+            for row in overlap:
+                best = row.max()
+                if best < GEOMETRY_MIN_OVERLAP:
+                    matches.append([])
+                    continue
+                close = np.flatnonzero(row >= best - GEOMETRY_TIE_MARGIN)
+                close = close[np.argsort(-row[close], kind="stable")]
+                matches.append([self.boxed[int(index)] for index in close])
+        return matches
+
+
+def _group_by_page(blocks: Sequence[Block]) -> dict[int | None, list[Block]]:
+    by_page: dict[int | None, list[Block]] = {}
+    for block in blocks:
+        by_page.setdefault(block.page, []).append(block)
+    return by_page
+
+
+def _reconciled(block: Block, match: Block, confidence: float) -> DocumentBlock:
+    return DocumentBlock(
+        kind=block.kind,
+        text=block.text,
+        page=block.page,
+        bbox=match.bbox or block.bbox,
+        source=block.source,
+        confidence=round(confidence, 4),
+    )
 
 
 def reconcile_blocks(
-    docling_blocks: list[DocumentBlock],
-    pymupdf_blocks: list[DocumentBlock],
-) -> list[DocumentBlock]:
-    pymupdf_by_page: dict[int | None, list[DocumentBlock]] = {}
-    for block in pymupdf_blocks:
-        pymupdf_by_page.setdefault(block.page, []).append(block)
+    docling_blocks: Sequence[Block],
+    pymupdf_blocks: Sequence[Block],
+) -> BlockTable:
+    """Attach each Docling block's best-matching PyMuPDF block on the same page.
+
+    Blocks carrying a Docling provenance box are joined spatially: the
+    PyMuPDF block with the highest intersection over the smaller box wins, and
+    text similarity only decides between blocks whose overlap is within
+    ``GEOMETRY_TIE_MARGIN`` of the best.
+    Blocks without a box, or overlapping nothing, are matched by text, where
+    dense pages only score a MinHash shortlist.
 
-    reconciled: list[DocumentBlock] = []
+    ``confidence`` is the ``SequenceMatcher`` ratio of the normalized texts of
+    the chosen pair, as in ``reconcile_blocks_exhaustive``. The result is a
+    ``BlockTable`` built row by row, so no per-block objects are retained.
+    """
+    indexes = {page: _PageIndex(blocks) for page, blocks in _group_by_page(pymupdf_blocks).items()}
+    boxed_by_page: dict[int | None, list[int]] = {}
+    for position, block in enumerate(docling_blocks):
+        if block.bbox and block.page in indexes and block.text.strip():
+            boxed_by_page.setdefault(block.page, []).append(position)
+    overlaps: dict[int, list[int]] = {}
+    for page, positions in boxed_by_page.items():
+        boxes = np.array([docling_blocks[p].bbox for p in positions], dtype=np.float64)
+        overlaps.update(zip(positions, indexes[page].overlaps(boxes), strict=True))
+
+    reconciled = BlockTableBuilder()
+    for position, block in enumerate(docling_blocks):
+        index = indexes.get(block.page)
+        text = block.text
+        if index is None or not text.strip():
+            reconciled.extend([block])
+            continue
+        match, confidence = index.best_match(_normalize_text(text), overlaps.get(position) or None)
+        reconciled.append(
+            block.kind,
+            text,
+            block.page,
+            match.bbox or block.bbox,
+            block.source,
+            round(confidence, 4),
+        )
+
+    return reconciled.build()
+
+
+def reconcile_blocks_exhaustive(
+    docling_blocks: Sequence[Block],
+    pymupdf_blocks: Sequence[Block],
+) -> list[Block]:
+    """Score every same-page candidate; the reference ``reconcile_blocks`` is measured against."""
+    pymupdf_by_page = _group_by_page(pymupdf_blocks)
+
+    reconciled: list[Block] = []
     for block in docling_blocks:
         page_blocks = pymupdf_by_page.get(block.page, [])
         if not page_blocks or not block.text.strip():
             reconciled.append(block)
             continue
 
-        best_match = max(
-            page_blocks,
-            key=lambda candidate: _overlap_confidence(block.text, candidate.text),
-        )
-        confidence = _overlap_confidence(block.text, best_match.text)
-        reconciled.append(
-            DocumentBlock(
-                kind=block.kind,
-                text=block.text,
-                page=block.page,
-                bbox=best_match.bbox or block.bbox,
-                source=block.source,
-                confidence=round(confidence, 4),
-            )
-        )
+        scored = [(_overlap_confidence(block.text, c.text), c) for c in page_blocks]
+        confidence, best_match = max(scored, key=lambda item: item[0])
+        reconciled.append(_reconciled(block, best_match, confidence))
 
     return reconciled
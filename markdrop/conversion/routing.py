@@ -0,0 +1,123 @@
+"""Per-page routing between the PyMuPDF fast path and Docling.
+
+Plain digital text pages are extracted with PyMuPDF; scanned, mixed, table-like
+and figure-heavy pages go to Docling. The table and figure signals only read
+the cached text dict and the page's drawing/image lists, so routing costs far
+less than one Docling page.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from typing import Any
+
+import pymupdf as fitz
+
+from .preflight import _classify_page
+from .session import DocumentSession
+from .types import PageKind, PreflightResult
+
+logger = logging.getLogger(__name__)
+
+ROUTE_FAST = "fast"
+ROUTE_DOCLING = "docling"
+
+# Horizontal/vertical rules and rectangles typical of a ruled table.
+TABLE_RULING_MIN = 6
+# Rows where at least TABULAR_ROW_CELLS text lines share a baseline at
+# different x positions, as in an unruled table.
+TABULAR_ROW_CELLS = 3
+TABULAR_ROW_MIN = 3
+# A figure is a large embedded image or a dense vector drawing (charts, diagrams).
+FIGURE_IMAGE_AREA = 0.15
+FIGURE_DRAWING_MIN = 100
+_AXIS_TOLERANCE = 1.0
+_ROW_TOLERANCE = 3.0
+
+
+def _ruling_count(drawings: list[dict[str, Any]]) -> int:
+    count = 0
+    for path in drawings:
+        for item in path.get("items", ()):
+            if item[0] == "re":
+                count += 1
+            elif item[0] == "l":
+                (x0, y0), (x1, y1) = item[1], item[2]
+                if abs(x0 - x1) < _AXIS_TOLERANCE or abs(y0 - y1) < _AXIS_TOLERANCE:
+                    count += 1
+    return count
+
+
+def _tabular_rows(text_dict: dict[str, Any]) -> int:
+    rows: dict[int, set[int]] = {}
+    for block in text_dict.get("blocks", []):
+        if block.get("type") != 0:
+            continue
+        for line in block.get("lines", []):
+            x0, y0 = line["bbox"][0], line["bbox"][1]
+            row = rows.setdefault(round(y0 / _ROW_TOLERANCE), set())
+            row.add(round(x0))
+    return sum(1 for starts in rows.values() if len(starts) >= TABULAR_ROW_CELLS)
+
+
+def _image_area_share(page: fitz.Page) -> float:
+    page_area = page.rect.width * page.rect.height
+    if page_area <= 0:
+        return 0.0
+    largest = 0.0
+    for info in page.get_image_info():
+        x0, y0, x1, y1 = info["bbox"]
+        largest = max(largest, (x1 - x0) * (y1 - y0))
+    return largest / page_area
+
+
+def page_route(page: fitz.Page, text_dict: dict[str, Any], kind: PageKind) -> tuple[str, str]:
+    """Return ``(route, reason)`` for one page."""
+    if kind != PageKind.DIGITAL:
+        return ROUTE_DOCLING, kind.value
+
+    drawings = page.get_cdrawings()
+    if _ruling_count(drawings) >= TABLE_RULING_MIN:
+        return ROUTE_DOCLING, "table"
+    if _tabular_rows(text_dict) >= TABULAR_ROW_MIN:
+        return ROUTE_DOCLING, "table"
+    if len(drawings) >= FIGURE_DRAWING_MIN or _image_area_share(page) >= FIGURE_IMAGE_AREA:
+        return ROUTE_DOCLING, "figure"
+    return ROUTE_FAST, "text"
+
+
+def route_pages(
+    session: DocumentSession,
+    preflight: PreflightResult,
+    first: int,
+    last: int,
+) -> dict[int, tuple[str, str]]:
+    """Route every page in ``first..last``; pages preflight only estimated are classified here."""
+    kinds = {item.page: item.kind for item in preflight.page_classifications}
+    routes: dict[int, tuple[str, str]] = {}
+    for page_num, page in session.iter_pages(first, last):
+        kind = kinds.get(page_num)
+        if kind is None:
+            kind = _classify_page(page, page_num, session).kind
+        routes[page_num] = page_route(page, session.text_dict(page_num, page), kind)
+
+    reasons = Counter(reason for route, reason in routes.values() if route == ROUTE_DOCLING)
+    logger.info(
+        "Routing %s page(s) to PyMuPDF and %s to Docling (%s)",
+        len(routes) - sum(reasons.values()),
+        sum(reasons.values()),
+        ", ".join(f"{reason}: {count}" for reason, count in sorted(reasons.items())) or "none",
+    )
+    return routes
+
+
+def routing_summary(routes: dict[int, tuple[str, str]]) -> dict[str, Any]:
+    docling_pages = sorted(page for page, (route, _) in routes.items() if route == ROUTE_DOCLING)
+    reasons = Counter(reason for route, reason in routes.values() if route == ROUTE_DOCLING)
+    return {
+        "enabled": True,
+        "fast_pages": len(routes) - len(docling_pages),
+        "docling_pages": docling_pages,
+        "docling_reasons": dict(sorted(reasons.items())),
+    }
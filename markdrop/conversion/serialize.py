@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import TextIO
 
-from .types import BlockKind, DocumentBlock
+from .blocks import Block
+from .types import BlockKind
 
 
-def _block_to_markdown(block: DocumentBlock) -> str:
+def _block_to_markdown(block: Block) -> str:
     text = block.text.strip()
     if not text:
         return ""
@@ -25,17 +28,35 @@ def _block_to_markdown(block: DocumentBlock) -> str:
     return text
 
 
-def write_markdown_from_blocks(blocks: list[DocumentBlock], output_path: Path) -> Path:
-    lines: list[str] = []
+def iter_markdown(blocks: Iterable[Block]) -> Iterator[str]:
+    """Yield the markdown of each block that renders to something."""
     for block in blocks:
         rendered = _block_to_markdown(block)
         if rendered:
-            lines.append(rendered)
-            lines.append("")
+            yield rendered
 
-    content = "\n".join(lines).rstrip() + "\n"
+
+def write_markdown(blocks: Iterable[Block], handle: TextIO) -> int:
+    """Write *blocks* to *handle* as they arrive, separated by blank lines.
+
+    *blocks* may be any iterator, such as an extraction generator, and
+    *handle* any text stream (an open file or ``io.StringIO``); only one block
+    is rendered at a time. Returns the number of blocks written.
+    """
+    written = 0
+    for rendered in iter_markdown(blocks):
+        if written:
+            handle.write("\n\n")
+        handle.write(rendered)
+        written += 1
+    handle.write("\n")
+    return written
+
+
+def write_markdown_from_blocks(blocks: Iterable[Block], output_path: Path) -> Path:
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(content, encoding="utf-8")
+    with output_path.open("w", encoding="utf-8") as handle:
+        write_markdown(blocks, handle)
     return output_path
 
 
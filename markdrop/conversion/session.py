@@ -0,0 +1,148 @@
+"""Per-document PyMuPDF session shared by preflight, reconcile and fast mode."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import pymupdf as fitz
+
+DEFAULT_PAGE_CACHE_SIZE = 128
+
+
+def _strip_image_payloads(text_dict: dict[str, Any]) -> dict[str, Any]:
+    # Image blocks carry the raw image bytes; nothing downstream reads them and
+    # keeping them would make the cache size depend on image weight, not pages.
+    for block in text_dict.get("blocks", []):
+        if block.get("type") == 1:
+            block.pop("image", None)
+    return text_dict
+
+
+class DocumentSession:
+    """Open a PDF once and memoize each page's ``get_text("dict")`` output.
+
+    Pages are 1-based, matching ``PageClassification.page`` and
+    ``DocumentBlock.page``. At most ``max_cached_pages`` text dicts are kept;
+    the least recently used page is evicted first. Stages that each scan the
+    whole document in turn only share pages if the cache holds all of them,
+    so callers ``reserve()`` the page range they are about to process.
+    """
+
+    def __init__(
+        self,
+        input_path: str | Path,
+        max_cached_pages: int = DEFAULT_PAGE_CACHE_SIZE,
+    ):
+        self.input_path = Path(input_path)
+        self.max_cached_pages = max(0, max_cached_pages)
+        self.doc = fitz.open(self.input_path)
+        self._text_dicts: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __enter__(self) -> DocumentSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._text_dicts.clear()
+        if not self.doc.is_closed:
+            self.doc.close()
+
+    @property
+    def page_count(self) -> int:
+        return self.doc.page_count
+
+    def page(self, page_num: int) -> fitz.Page:
+        return self.doc.load_page(page_num - 1)
+
+    def iter_pages(
+        self,
+        start: int = 1,
+        stop: int | None = None,
+    ) -> Iterator[tuple[int, fitz.Page]]:
+        """Yield ``(page_num, page)`` for 1-based pages ``start`` to ``stop`` inclusive."""
+        last = self.doc.page_count if stop is None else min(stop, self.doc.page_count)
+        for page_num in range(max(start, 1), last + 1):
+            yield page_num, self.doc.load_page(page_num - 1)
+
+    def reserve(self, pages: int) -> None:
+        """Grow the cache to hold *pages* text dicts, unless caching is disabled."""
+        if self.max_cached_pages:
+            self.max_cached_pages = max(self.max_cached_pages, pages)
+
+    def text_dict(self, page_num: int, page: fitz.Page | None = None) -> dict[str, Any]:
+        cached = self._text_dicts.get(page_num)
+        if cached is not None:
+            self._text_dicts.move_to_end(page_num)
+            self.cache_hits += 1
+            return cached
+
+        self.cache_misses += 1
+        if page is None:
+            page = self.page(page_num)
+        text_dict = _strip_image_payloads(page.get_text("dict"))
+        if self.max_cached_pages:
+            self._text_dicts[page_num] = text_dict
+            while len(self._text_dicts) > self.max_cached_pages:
+                self._text_dicts.popitem(last=False)
+        return text_dict
+
+    def cache_stats(self) -> dict[str, int]:
+        return {
+            "page_text_hits": self.cache_hits,
+            "page_text_misses": self.cache_misses,
+        }
+
+
+def resolve_page_range(
+    page_range: tuple[int, int] | None,
+    page_count: int,
+) -> tuple[int, int]:
+    """Clamp a 1-based inclusive ``(first, last)`` range to the document."""
+    if page_range is None:
+        return 1, page_count
+    first, last = page_range
+    if first < 1 or last < first:
+        raise ValueError(f"Invalid page range {first}-{last}; expected 1 <= first <= last")
+    if first > page_count:
+        raise ValueError(f"Page range starts at {first} but the document has {page_count} pages")
+    return first, min(last, page_count)
+
+
+def parse_page_range(value: str) -> tuple[int, int]:
+    """Parse ``"first-last"`` (or a single page ``"n"``) into a 1-based inclusive range."""
+    first, _, last = value.strip().partition("-")
+    try:
+        page_range = (int(first), int(last or first))
+    except ValueError:
+        raise ValueError(f"invalid page range: {value!r}") from None
+    if page_range[0] < 1 or page_range[1] < page_range[0]:
+        raise ValueError(f"invalid page range: {value!r}")
+    return page_range
+
+
+def page_windows(first: int, last: int, size: int) -> list[tuple[int, int]]:
+    """Split ``first..last`` into contiguous inclusive windows of at most *size* pages."""
+    size = max(size, 1)
+    return [(start, min(start + size - 1, last)) for start in range(first, last + 1, size)]
+
+
+@contextmanager
+def use_session(
+    input_path: str | Path,
+    session: DocumentSession | None = None,
+) -> Iterator[DocumentSession]:
+    """Yield *session* if given, otherwise open (and afterwards close) a new one."""
+    if session is not None:
+        yield session
+        return
+
+    with DocumentSession(input_path) as owned:
+        yield owned
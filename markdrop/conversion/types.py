@@ -3,7 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .blocks import BlockTable
 
 
 class BlockKind(Enum):
@@ -44,6 +47,11 @@ class PreflightResult:
     page_classifications: list[PageClassification]
     total_pages: int
     warnings: list[str] = field(default_factory=list)
+    strategy: str = "full"
+    sampled_pages: list[int] = field(default_factory=list)
+    estimated_pages: list[int] = field(default_factory=list)
+    kind_estimates: dict[str, float] = field(default_factory=dict)
+    confidence: float = 1.0
 
 
 @dataclass
@@ -56,6 +64,19 @@ class DoclingConversionResult:
     images_dir: Path
     table_counter: int
     picture_counter: int
+    docling_blocks: BlockTable | None = None
+    assets: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class PagedConversionResult:
+    docling_result: DoclingConversionResult
+    reconciled_blocks: BlockTable
+    docling_block_count: int
+    pymupdf_block_count: int
+    runs: list[tuple[int, int]]
+    fingerprints: dict[int, dict[str, str]] = field(default_factory=dict)
+    incremental: dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -65,3 +86,9 @@ class ConversionResult:
     assets_dir: Path
     manifest: dict[str, Any]
     warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult:
+    summary_path: Path
+    summary: dict[str, Any]
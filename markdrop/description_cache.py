@@ -0,0 +1,207 @@
+"""Persistent cache of AI image and table descriptions.
+
+Descriptions are stored in a SQLite file keyed by a hash of the content (image
+bytes or normalized table text), the provider, the effective model and the
+prompt, so a repeated logo or a rerun after a crash costs no API calls.
+Identical requests that are in flight at the same time share one call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024**2
+_HASH_CHUNK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS descriptions (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    description TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+def image_digest(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def table_digest(table: str) -> str:
+    """Hash *table* with surrounding and repeated whitespace on each line ignored."""
+    normalized = "\n".join(" ".join(line.split()) for line in table.strip().splitlines())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def description_key(kind: str, content_digest: str, provider: str, model: str, prompt: str) -> str:
+    payload = json.dumps([kind, content_digest, provider, model, prompt])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DescriptionCache:
+    """SQLite-backed description store with TTL and size-based eviction.
+
+    Entries older than ``ttl_seconds`` are treated as missing and removed.
+    When the stored descriptions exceed ``max_bytes``, the least recently
+    used entries are deleted first. ``hits``, ``misses`` and ``coalesced``
+    count ``get_or_compute`` outcomes for ``report()``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._pending: dict[str, asyncio.Future[str]] = {}
+        self.purge_expired()
+
+    def __enter__(self) -> DescriptionCache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description, created FROM descriptions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            description, created = row
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM descriptions WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE descriptions SET accessed = ? WHERE key = ?", (now, key))
+        return description
+
+    def put(self, key: str, kind: str, description: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO descriptions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, description, len(description.encode("utf-8")), now, now),
+            )
+        self.evict()
+
+    def purge_expired(self) -> None:
+        if not self.ttl_seconds:
+            return
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM descriptions WHERE created < ?", (time.time() - self.ttl_seconds,)
+            )
+
+    def evict(self) -> None:
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM descriptions"
+            ).fetchone()
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute(
+                "SELECT key, size FROM descriptions ORDER BY accessed"
+            ).fetchall()
+            evicted = []
+            for key, size in rows:
+                evicted.append((key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            self._conn.executemany("DELETE FROM descriptions WHERE key = ?", evicted)
+        logger.debug("Evicted %s description cache entries", len(evicted))
+
+    async def get_or_compute(
+        self, key: str, kind: str, compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return the cached description for *key*, or await *compute* and store its result.
+
+        Concurrent calls for the same *key* wait for the first one's result. A
+        failed *compute*, or one that returns no string, is not stored, and its
+        exception reaches every waiter. A description that cannot be stored is
+        still returned.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            description = await compute()
+            if not isinstance(description, str):
+                raise TypeError(f"expected a str description, got {type(description).__name__}")
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()  # waiters re-raise it; nothing else needs to retrieve it
+            raise
+        else:
+            future.set_result(description)
+            try:
+                self.put(key, kind, description)
+            except Exception as exc:
+                logger.warning("Could not store description in %s: %s", self.path, exc)
+            return description
+        finally:
+            # Waiters must never be left pending, whatever happened above.
+            if not future.done():
+                future.cancel()
+            self._pending.pop(key, None)
+
+    def report(self) -> dict[str, Any]:
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": True,
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / requests, 3) if requests else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
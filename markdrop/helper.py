@@ -5,6 +5,8 @@ from datetime import datetime
 
 import pymupdf as fitz
 
+from .conversion.session import DocumentSession
+
 
 def analyze_pdf_images_main(
     source: str, output_dir: str, verbose: bool = False, save_images: bool = False
@@ -37,7 +39,8 @@ def analyze_pdf_images_main(
         pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        with fitz.open(pdf_path) as doc:
+        with DocumentSession(pdf_path) as session:
+            doc = session.doc
             embedded_images = {}
             markdown_refs = defaultdict(lambda: {"count": 0, "xrefs": set()})
 
@@ -46,7 +49,7 @@ def analyze_pdf_images_main(
                 images_dir = os.path.join(output_dir, f"{pdf_name}_images_{timestamp}")
                 os.makedirs(images_dir, exist_ok=True)
 
-            for page_num, page in enumerate(doc, 1):
+            for page_num, page in session.iter_pages():
                 # Analyze embedded images
                 for img_idx, img in enumerate(page.get_images()):
                     xref = img[0]
@@ -83,7 +86,7 @@ def analyze_pdf_images_main(
                                     print(f"Error saving image {xref}: {e}")
 
                 # Analyze markdown/external references
-                blocks = page.get_text("dict")["blocks"]
+                blocks = session.text_dict(page_num, page)["blocks"]
                 for block in blocks:
                     if block.get("type") == 1:
                         markdown_refs[page_num]["count"] += 1
@@ -0,0 +1,85 @@
+"""Perceptual-hash grouping of near-identical images before they are described.
+
+Recurring figures (headers, watermarks, signature blocks) are re-rendered
+with slightly different bytes on every page, so exact hashes miss them. A
+64-bit difference hash (dHash) survives re-encoding and small rendering
+changes; images whose hashes differ in at most ``max_distance`` bits and
+whose aspect ratios agree within ``ASPECT_TOLERANCE`` are described once.
+The hash is computed on a fixed-size thumbnail, so without the aspect check
+a wide banner and a square figure of similar layout could collide.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+ASPECT_TOLERANCE = 0.05
+
+
+def _dhash_image(image: Image.Image, hash_size: int) -> int:
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash(path: str | Path, hash_size: int = HASH_SIZE) -> int:
+    """Return the ``hash_size**2``-bit difference hash of the image at *path*.
+
+    Each bit records whether a pixel of the grayscale image, shrunk to
+    ``(hash_size + 1) x hash_size``, is brighter than its right neighbour.
+    """
+    with Image.open(path) as image:
+        return _dhash_image(image, hash_size)
+
+
+def group_similar(
+    paths: Iterable[Path],
+    max_distance: int,
+    aspect_tolerance: float = ASPECT_TOLERANCE,
+) -> dict[Path, Path]:
+    """Map each image path to the first earlier similar path.
+
+    Similar means a dHash within *max_distance* bits and a width/height
+    ratio within *aspect_tolerance* (relative) of the earlier image's.
+    Groups are formed greedily in the given order, so every group is
+    represented by its first image. Images that cannot be read or hashed
+    represent themselves.
+    """
+    representatives: dict[Path, Path] = {}
+    group_paths: list[Path] = []
+    group_hashes: list[int] = []
+    group_aspects: list[float] = []
+    for path in paths:
+        if path in representatives:
+            continue
+        try:
+            with Image.open(path) as image:
+                value = _dhash_image(image, HASH_SIZE)
+                aspect = image.width / image.height
+        except Exception as exc:
+            logger.debug("Cannot hash %s: %s", path, exc)
+            representatives[path] = path
+            continue
+        if group_hashes:
+            xor = np.array(group_hashes, dtype=np.uint64) ^ np.uint64(value)
+            distances = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+            same_shape = np.abs(np.array(group_aspects) / aspect - 1) <= aspect_tolerance
+            distances = np.where(same_shape, distances, HASH_SIZE**2 + 1)
+            nearest = int(distances.argmin())
+            if distances[nearest] <= max_distance:
+                representatives[path] = group_paths[nearest]
+                continue
+        representatives[path] = path
+        group_paths.append(path)
+        group_hashes.append(value)
+        group_aspects.append(aspect)
+    return representatives
@@ -7,6 +7,8 @@ from pathlib import Path
 
 from . import __version__
 from .config import MarkDropConfig
+from .conversion import convert_many
+from .conversion.session import parse_page_range
 from .helper import analyze_pdf_images
 from .models.img_descriptions import generate_descriptions
 from .parse import AIProvider, ProcessorConfig, process_markdown
@@ -38,6 +40,23 @@ def configure_logging(log_level=logging.INFO):
     logger.addHandler(sh)
 
 
+def _parse_page_range(value: str) -> tuple[int, int]:
+    try:
+        return parse_page_range(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def _non_negative_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or greater: {value}")
+    return number
+
+
 def main():
     configure_logging()
 
@@ -72,6 +91,214 @@ def main():
             "skips layout models and table structure detection."
         ),
     )
+    convert_parser.add_argument(
+        "--profile",
+        choices=["throughput", "balanced", "accuracy"],
+        default="balanced",
+        help=(
+            "Docling performance profile: table mode, OCR, threads, page images and "
+            "batch size (see docs/cli_reference.md)"
+        ),
+    )
+    convert_parser.add_argument(
+        "--pages",
+        type=_parse_page_range,
+        default=None,
+        help="Convert only this 1-based inclusive page range, e.g. 10-50 (or a single page: 7)",
+    )
+    convert_parser.add_argument(
+        "--window_pages",
+        type=int,
+        default=0,
+        help=(
+            "Run Docling on this many pages at a time and free each window before the next; "
+            "bounds memory on very long PDFs (0 = whole document at once)"
+        ),
+    )
+    convert_parser.add_argument(
+        "--hybrid",
+        action="store_true",
+        help=(
+            "Extract plain digital text pages with PyMuPDF and send only scanned, mixed, "
+            "table or figure pages through Docling"
+        ),
+    )
+    convert_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Reuse the previous run in --output_dir and re-run Docling only on pages "
+            "whose content changed"
+        ),
+    )
+    convert_parser.add_argument(
+        "--no_cache",
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the on-disk stage cache",
+    )
+    convert_parser.add_argument(
+        "--asset_format",
+        choices=["png", "webp", "jpeg"],
+        default="png",
+        help="Image format for exported table and picture crops",
+    )
+    convert_parser.add_argument(
+        "--asset_quality",
+        type=int,
+        default=90,
+        help="WebP/JPEG quality for exported crops (1-100)",
+    )
+    convert_parser.add_argument(
+        "--lazy_page_images",
+        action="store_true",
+        help=(
+            "Keep no page images from Docling; render only pages with tables or pictures, "
+            "one at a time, when their crops are exported"
+        ),
+    )
+    convert_parser.add_argument(
+        "--crop_pixel_budget",
+        type=int,
+        default=0,
+        help=(
+            "Clip-render each table/picture from the PDF at the DPI that gives it about "
+            "this many pixels (0 = crop page images)"
+        ),
+    )
+    convert_parser.add_argument(
+        "--embedded_images",
+        action="store_true",
+        help=(
+            "Write pictures that are a single embedded bitmap from their original "
+            "JPEG/JP2/PNG stream instead of rendering them"
+        ),
+    )
+
+    # ------------------------------------------------------------ convert-batch
+    batch_parser = subparsers.add_parser(
+        "convert-batch",
+        help="Convert many PDFs with a pool of worker processes.",
+    )
+    batch_parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="PDF paths, URLs, glob patterns (quote them) or directories",
+    )
+    batch_parser.add_argument(
+        "--from_file", type=str, default=None, help="File with one PDF path or URL per line"
+    )
+    batch_parser.add_argument(
+        "--output_dir",
+        type=str,
+        default="output",
+        help="Directory that receives one subdirectory per document",
+    )
+    batch_parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes (0 = one per CPU)"
+    )
+    batch_parser.add_argument(
+        "--max_tasks_per_worker",
+        type=_non_negative_int,
+        default=20,
+        help="Recycle each worker after this many documents to contain memory growth (0 = never)",
+    )
+    batch_parser.add_argument(
+        "--fast", action="store_true", help="PyMuPDF-only conversion (see `convert --fast`)"
+    )
+    batch_parser.add_argument(
+        "--hybrid", action="store_true", help="Per-page routing (see `convert --hybrid`)"
+    )
+    batch_parser.add_argument(
+        "--profile",
+        choices=["throughput", "balanced", "accuracy"],
+        default="balanced",
+        help="Docling performance profile (see `convert --profile`)",
+    )
+    batch_parser.add_argument(
+        "--window_pages",
+        type=int,
+        default=0,
+        help="Docling pages per window for each document (0 = whole document)",
+    )
+    batch_parser.add_argument(
+        "--no_cache",
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the on-disk stage cache",
+    )
+
+    # ------------------------------------------------------------------ serve
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run a local HTTP conversion server that keeps models loaded.",
+    )
+    serve_parser.add_argument("--host", type=str, default="127.0.0.1", help="Bind address")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Listen port")
+    serve_parser.add_argument(
+        "--output_dir",
+        type=str,
+        default="output/serve",
+        help="Directory that receives one subdirectory per request",
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Concurrent conversions; each worker is a process with its own Docling models",
+    )
+    serve_parser.add_argument(
+        "--max_queue",
+        type=int,
+        default=16,
+        help="Requests allowed to wait for a worker before the server answers 503",
+    )
+    serve_parser.add_argument(
+        "--fast", action="store_true", help="PyMuPDF-only conversion (see `convert --fast`)"
+    )
+    serve_parser.add_argument(
+        "--hybrid", action="store_true", help="Per-page routing (see `convert --hybrid`)"
+    )
+    serve_parser.add_argument(
+        "--profile",
+        choices=["throughput", "balanced", "accuracy"],
+        default="balanced",
+        help="Docling performance profile (see `convert --profile`)",
+    )
+    serve_parser.add_argument(
+        "--window_pages",
+        type=int,
+        default=0,
+        help="Docling pages per window for each document (0 = whole document)",
+    )
+    serve_parser.add_argument(
+        "--no_cache",
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the on-disk stage cache",
+    )
+    serve_parser.add_argument(
+        "--input_root",
+        type=str,
+        default=None,
+        help="Directory JSON requests may name files under (default: uploads only)",
+    )
+    serve_parser.add_argument(
+        "--allow_remote",
+        action="store_true",
+        help="Let JSON requests name http(s) URLs for the server to download",
+    )
+    serve_parser.add_argument(
+        "--keep_jobs",
+        type=int,
+        default=100,
+        help="Finished job directories kept before the oldest are deleted (0 = keep all)",
+    )
+    serve_parser.add_argument(
+        "--no_warm",
+        action="store_true",
+        help="Load models on the first request instead of at startup",
+    )
 
     # ------------------------------------------------------------------ describe
     describe_parser = subparsers.add_parser(
@@ -124,6 +351,33 @@ def main():
         default="",
         help="Override the text-only model (used for table descriptions). Same format as --model.",
     )
+    describe_parser.add_argument(
+        "--no_cache",
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the persistent description cache",
+    )
+    describe_parser.add_argument(
+        "--requests_per_minute",
+        type=int,
+        default=0,
+        help="Provider request budget per minute (0 = no limit)",
+    )
+    describe_parser.add_argument(
+        "--tokens_per_minute",
+        type=int,
+        default=0,
+        help="Provider token budget per minute, from estimated request sizes (0 = no limit)",
+    )
+    describe_parser.add_argument(
+        "--dedupe_distance",
+        type=int,
+        default=-1,
+        help=(
+            "Describe one image per group of same-shaped images whose perceptual hashes "
+            "differ in at most this many of 64 bits, e.g. 4 (default -1 = describe every image)"
+        ),
+    )
 
     # ------------------------------------------------------------------ analyze
     analyze_parser = subparsers.add_parser("analyze", help="Analyze images in a PDF file")
@@ -171,9 +425,21 @@ def main():
 
     try:
         if args.command == "convert":
-            config = MarkDropConfig(fast=args.fast)
+            config = MarkDropConfig(
+                fast=args.fast,
+                profile=args.profile,
+                hybrid=args.hybrid,
+                window_pages=args.window_pages,
+                stage_cache=not args.no_cache,
+                incremental=args.incremental,
+                asset_format=args.asset_format,
+                asset_quality=args.asset_quality,
+                lazy_page_images=args.lazy_page_images,
+                crop_pixel_budget=args.crop_pixel_budget,
+                embedded_images=args.embedded_images,
+            )
             output_dir = Path(args.output_dir)
-            html_path = markdrop(args.input_path, str(output_dir), config)
+            html_path = markdrop(args.input_path, str(output_dir), config, page_range=args.pages)
             md_path = html_path.with_suffix(".md")
             tables_path = None
             if args.add_tables:
@@ -183,6 +449,56 @@ def main():
             if tables_path:
                 print(f"Downloadable tables HTML: {tables_path.resolve()}")
 
+        elif args.command == "convert-batch":
+            if not args.inputs and not args.from_file:
+                batch_parser.error("provide input paths or --from_file")
+            config = MarkDropConfig(
+                fast=args.fast,
+                profile=args.profile,
+                hybrid=args.hybrid,
+                window_pages=args.window_pages,
+                stage_cache=not args.no_cache,
+            )
+            batch = convert_many(
+                args.inputs,
+                args.output_dir,
+                config,
+                workers=args.workers,
+                max_tasks_per_worker=args.max_tasks_per_worker,
+                list_file=args.from_file,
+            )
+            summary = batch.summary
+            print(
+                f"Converted {summary['succeeded']}/{summary['documents']} document(s) "
+                f"in {summary['wall_seconds']}s ({summary['pages_per_second']} pages/s)"
+            )
+            print(f"Summary: {batch.summary_path.resolve()}")
+            if summary["failed"]:
+                sys.exit(1)
+
+        elif args.command == "serve":
+            from .serve import serve
+
+            config = MarkDropConfig(
+                fast=args.fast,
+                profile=args.profile,
+                hybrid=args.hybrid,
+                window_pages=args.window_pages,
+                stage_cache=not args.no_cache,
+            )
+            serve(
+                args.output_dir,
+                config,
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                max_queue=args.max_queue,
+                warm=not args.no_warm,
+                input_root=args.input_root,
+                allow_remote=args.allow_remote,
+                keep_jobs=args.keep_jobs,
+            )
+
         elif args.command == "describe":
             config = ProcessorConfig(
                 input_path=str(Path(args.input_path)),
@@ -192,6 +508,11 @@ def main():
                 remove_tables=args.remove_tables,
                 model_name_override=args.model,
                 text_model_name_override=args.text_model,
+                description_cache=not args.no_cache,
+                requests_per_minute=args.requests_per_minute,
+                tokens_per_minute=args.tokens_per_minute,
+                image_dedupe=args.dedupe_distance >= 0,
+                image_dedupe_distance=max(args.dedupe_distance, 0),
             )
             processed_path = asyncio.run(process_markdown(config))
             print(f"Processed markdown: {processed_path.resolve()}")
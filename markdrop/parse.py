@@ -20,6 +20,8 @@ import logging
 import os
 import re
 import shutil
+import stat
+import tempfile
 import time
 import urllib.parse
 from dataclasses import dataclass, field
@@ -27,7 +29,16 @@ from datetime import datetime
 from enum import Enum
 from pathlib import Path
 
-from .config_paths import get_gemini_api_key, load_markdrop_env
+from .config_paths import get_cache_dir, get_gemini_api_key, load_markdrop_env
+from .description_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_TTL_SECONDS,
+    DescriptionCache,
+    description_key,
+    image_digest,
+    table_digest,
+)
+from .rate_limit import RateController
 
 # ---------------------------------------------------------------------------
 # Named logger (handlers are configured in main.py)
@@ -60,6 +71,10 @@ DEFAULT_IMAGE_PROMPT = (
     "Make it descriptive enough to serve as a replacement for the image."
 )
 
+# Rough request sizes for the tokens-per-minute budget.
+IMAGE_TOKEN_ESTIMATE = 1000
+MAX_OUTPUT_TOKENS = 500
+
 DEFAULT_TABLE_PROMPT = (
     "Analyze this markdown table and provide a detailed description of its contents. "
     "Include key insights, patterns, and important details. Make the summary "
@@ -86,6 +101,26 @@ class ProcessorConfig:
     max_concurrency: int = 8
     timeout_seconds: int = 120
 
+    # Per-provider rate control: request and token budgets per minute (0 = no
+    # limit), an adaptive concurrency limit up to max_concurrency, and
+    # exponential backoff from retry_delay capped at max_retry_delay seconds.
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    max_retry_delay: float = 60.0
+
+    # Persistent description cache keyed by content hash, provider, model and
+    # prompt. An empty path uses <user cache dir>/descriptions.sqlite3.
+    description_cache: bool = True
+    description_cache_path: str = ""
+    description_cache_ttl_seconds: int = DEFAULT_TTL_SECONDS
+    description_cache_max_bytes: int = DEFAULT_MAX_BYTES
+
+    # Describe one image per group of near-identical images (64-bit dHash
+    # within image_dedupe_distance bits, same aspect ratio) and reuse its
+    # description. Off by default: similar-looking figures may differ in detail.
+    image_dedupe: bool = False
+    image_dedupe_distance: int = 4
+
     # ----------------------------------------------------------------
     # Generic override: set either of these to force a specific model
     # for the selected provider (takes precedence over provider-specific
@@ -173,19 +208,76 @@ class AIProcessor:
             )
         self.config = config
         self._setup_ai_clients()
+        self.rate = RateController(
+            config.max_concurrency,
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            max_retries=config.max_retries,
+            base_delay=config.retry_delay,
+            max_delay=config.max_retry_delay,
+        )
+        self.cache: DescriptionCache | None = None
+        if config.description_cache:
+            self.cache = DescriptionCache(
+                config.description_cache_path or get_cache_dir() / "descriptions.sqlite3",
+                ttl_seconds=config.description_cache_ttl_seconds,
+                max_bytes=config.description_cache_max_bytes,
+            )
+
+    async def aclose(self) -> None:
+        """Close the description cache and the provider client's connection pool."""
+        if self.cache is not None:
+            self.cache.close()
+        if self.client is not None:
+            await self.client.close()
+        if self.gemini_client is not None:
+            # google-genai releases without aclose() leave the pool to the garbage collector.
+            aclose = getattr(self.gemini_client.aio, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _describe(
+        self, kind: str, digest: str, model: str, prompt: str, call, tokens: float
+    ) -> str:
+        """Run *call* with retries, through the description cache when enabled."""
+        if self.cache is None:
+            return await self._process_with_retry(call, tokens)
+        key = description_key(kind, digest, self.config.ai_provider.value, model, prompt)
+        return await self.cache.get_or_compute(
+            key, kind, lambda: self._process_with_retry(call, tokens)
+        )
 
     # ------------------------------------------------------------------
     # Client initialisation
     # ------------------------------------------------------------------
 
+    def _http_client(self):
+        """An async HTTP client whose connection pool matches ``max_concurrency``."""
+        import httpx  # type: ignore
+
+        size = max(self.config.max_concurrency, 1)
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+            follow_redirects=True,
+        )
+
     def _setup_ai_clients(self):
-        """Lazily import and initialise only the required provider client."""
+        """Lazily import and initialise only the required provider client.
+
+        Every client is the provider's native async client, so in-flight
+        requests are bounded by the connection pool rather than by threads.
+        SDK retries are disabled (google-genai does not retry by default), so
+        ``RateController`` is the only retry layer and sees every 429.
+        """
         load_markdrop_env()
 
         p = self.config.ai_provider
         timeout = self.config.timeout_seconds
+        self.client = None
+        self.gemini_client = None
 
         if p == AIProvider.GEMINI:
+            import httpx  # type: ignore
             from google import genai  # type: ignore
 
             api_key = get_gemini_api_key()
@@ -193,18 +285,29 @@ class AIProcessor:
                 raise ValueError(
                     "GEMINI_API_KEY (or GOOGLE_API_KEY) not found – run: markdrop setup gemini"
                 )
+            size = max(self.config.max_concurrency, 1)
             self.gemini_client = genai.Client(
                 api_key=api_key,
-                http_options={"timeout": timeout * 1000},
+                http_options={
+                    "timeout": timeout * 1000,
+                    "async_client_args": {
+                        "limits": httpx.Limits(max_connections=size, max_keepalive_connections=size)
+                    },
+                },
             )
 
         elif p == AIProvider.OPENAI:
-            from openai import OpenAI  # type: ignore
+            from openai import AsyncOpenAI  # type: ignore
 
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found – run: markdrop setup openai")
-            self.client = OpenAI(api_key=api_key, timeout=timeout)
+            self.client = AsyncOpenAI(
+                api_key=api_key,
+                timeout=timeout,
+                max_retries=0,
+                http_client=self._http_client(),
+            )
 
         elif p == AIProvider.ANTHROPIC:
             import anthropic  # type: ignore
@@ -212,22 +315,29 @@ class AIProcessor:
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY not found – run: markdrop setup anthropic")
-            self.client = anthropic.Anthropic(api_key=api_key, timeout=timeout)
+            self.client = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                timeout=timeout,
+                max_retries=0,
+                http_client=self._http_client(),
+            )
 
         elif p == AIProvider.GROQ:
-            from openai import OpenAI  # type: ignore
+            from openai import AsyncOpenAI  # type: ignore
 
             api_key = os.getenv("GROQ_API_KEY")
             if not api_key:
                 raise ValueError("GROQ_API_KEY not found – run: markdrop setup groq")
-            self.client = OpenAI(
+            self.client = AsyncOpenAI(
                 api_key=api_key,
                 base_url="https://api.groq.com/openai/v1",
                 timeout=timeout,
+                max_retries=0,
+                http_client=self._http_client(),
             )
 
         elif p == AIProvider.OPENROUTER:
-            from openai import OpenAI  # type: ignore
+            from openai import AsyncOpenAI  # type: ignore
 
             api_key = os.getenv("OPENROUTER_API_KEY")
             if not api_key:
@@ -237,11 +347,13 @@ class AIProcessor:
                 extra_headers["HTTP-Referer"] = self.config.openrouter_site_url
             if self.config.openrouter_site_name:
                 extra_headers["X-Title"] = self.config.openrouter_site_name
-            self.client = OpenAI(
+            self.client = AsyncOpenAI(
                 api_key=api_key,
                 base_url="https://openrouter.ai/api/v1",
                 default_headers=extra_headers,
                 timeout=timeout,
+                max_retries=0,
+                http_client=self._http_client(),
             )
 
         elif p == AIProvider.LITELLM:
@@ -274,7 +386,19 @@ class AIProcessor:
         return mapping.get(ext, "image/jpeg")
 
     async def process_image(self, image_path: str) -> str:
-        """Generate a text description for the image at *image_path* asynchronously."""
+        """Generate a text description for the image at *image_path* asynchronously.
+
+        Failures are logged and returned as an ``[Image processing failed: ...]``
+        placeholder; ``describe_image`` raises them instead.
+        """
+        try:
+            return await self.describe_image(image_path)
+        except Exception as e:
+            logger.error(f"Failed to process image {image_path}: {e}")
+            return f"[Image processing failed: {image_path}]"
+
+    async def describe_image(self, image_path: str) -> str:
+        """Like ``process_image``, but a failed description raises."""
         start = time.time()
         logger.info(f"Processing image [{self.config.ai_provider.value}]: {image_path}")
 
@@ -282,20 +406,20 @@ class AIProcessor:
 
         if p == AIProvider.GEMINI:
 
-            def _call():
+            async def _call():
                 from PIL import Image  # type: ignore
 
                 img = Image.open(image_path)
-                response = self.gemini_client.models.generate_content(
+                response = await self.gemini_client.aio.models.generate_content(
                     model=self.config.effective_model(), contents=[self.config.image_prompt, img]
                 )
                 return response.text
         elif p == AIProvider.OPENAI:
 
-            def _call():
+            async def _call():
                 b64 = self._encode_image_b64(image_path)
                 media = self._image_media_type(image_path)
-                resp = self.client.chat.completions.create(
+                resp = await self.client.chat.completions.create(
                     model=self.config.effective_model(),
                     messages=[
                         {
@@ -309,17 +433,17 @@ class AIProcessor:
                             ],
                         }
                     ],
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                 )
                 return resp.choices[0].message.content
         elif p == AIProvider.ANTHROPIC:
 
-            def _call():
+            async def _call():
                 b64 = self._encode_image_b64(image_path)
                 media = self._image_media_type(image_path)
-                resp = self.client.messages.create(
+                resp = await self.client.messages.create(
                     model=self.config.effective_model(),
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                     messages=[
                         {
                             "role": "user",
@@ -340,10 +464,10 @@ class AIProcessor:
                 return resp.content[0].text
         elif p == AIProvider.GROQ:
 
-            def _call():
+            async def _call():
                 b64 = self._encode_image_b64(image_path)
                 media = self._image_media_type(image_path)
-                resp = self.client.chat.completions.create(
+                resp = await self.client.chat.completions.create(
                     model=self.config.effective_model(),
                     messages=[
                         {
@@ -357,15 +481,15 @@ class AIProcessor:
                             ],
                         }
                     ],
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                 )
                 return resp.choices[0].message.content
         elif p == AIProvider.OPENROUTER:
 
-            def _call():
+            async def _call():
                 b64 = self._encode_image_b64(image_path)
                 media = self._image_media_type(image_path)
-                resp = self.client.chat.completions.create(
+                resp = await self.client.chat.completions.create(
                     model=self.config.effective_model(),
                     messages=[
                         {
@@ -379,15 +503,15 @@ class AIProcessor:
                             ],
                         }
                     ],
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                 )
                 return resp.choices[0].message.content
         elif p == AIProvider.LITELLM:
 
-            def _call():
+            async def _call():
                 b64 = self._encode_image_b64(image_path)
                 media = self._image_media_type(image_path)
-                resp = self._litellm.completion(
+                resp = await self._litellm.acompletion(
                     model=self.config.effective_model(),
                     messages=[
                         {
@@ -401,20 +525,25 @@ class AIProcessor:
                             ],
                         }
                     ],
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                     timeout=self.config.timeout_seconds,
+                    num_retries=0,
+                    max_retries=0,
                 )
                 return resp.choices[0].message.content
         else:
             return f"[Unsupported provider: {p}]"
 
-        try:
-            description = await self._process_with_retry(_call)
-            logger.info(f"Image processed in {time.time() - start:.2f}s")
-            return description
-        except Exception as e:
-            logger.error(f"Failed to process image {image_path}: {e}")
-            return f"[Image processing failed: {image_path}]"
+        description = await self._describe(
+            "image",
+            image_digest(image_path),
+            self.config.effective_model(),
+            self.config.image_prompt,
+            _call,
+            IMAGE_TOKEN_ESTIMATE + MAX_OUTPUT_TOKENS,
+        )
+        logger.info(f"Image processed in {time.time() - start:.2f}s")
+        return description
 
     # ------------------------------------------------------------------
     # Table processing (text-only)
@@ -428,44 +557,53 @@ class AIProcessor:
 
         if p == AIProvider.GEMINI:
 
-            def _call():
-                response = self.gemini_client.models.generate_content(
+            async def _call():
+                response = await self.gemini_client.aio.models.generate_content(
                     model=self.config.effective_text_model(), contents=full_prompt
                 )
                 return response.text
         elif p in (AIProvider.OPENAI, AIProvider.GROQ, AIProvider.OPENROUTER):
 
-            def _call():
-                resp = self.client.chat.completions.create(
+            async def _call():
+                resp = await self.client.chat.completions.create(
                     model=self.config.effective_text_model(),
                     messages=[{"role": "user", "content": full_prompt}],
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                 )
                 return resp.choices[0].message.content
         elif p == AIProvider.ANTHROPIC:
 
-            def _call():
-                resp = self.client.messages.create(
+            async def _call():
+                resp = await self.client.messages.create(
                     model=self.config.effective_text_model(),
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                     messages=[{"role": "user", "content": full_prompt}],
                 )
                 return resp.content[0].text
         elif p == AIProvider.LITELLM:
 
-            def _call():
-                resp = self._litellm.completion(
+            async def _call():
+                resp = await self._litellm.acompletion(
                     model=self.config.effective_text_model(),
                     messages=[{"role": "user", "content": full_prompt}],
-                    max_tokens=500,
+                    max_tokens=MAX_OUTPUT_TOKENS,
                     timeout=self.config.timeout_seconds,
+                    num_retries=0,
+                    max_retries=0,
                 )
                 return resp.choices[0].message.content
         else:
             return "[Unsupported provider]"
 
         try:
-            summary = await self._process_with_retry(_call)
+            summary = await self._describe(
+                "table",
+                table_digest(table_content),
+                self.config.effective_text_model(),
+                self.config.table_prompt,
+                _call,
+                len(full_prompt) / 4 + MAX_OUTPUT_TOKENS,
+            )
             logger.info(f"Table processed in {time.time() - start:.2f}s")
             return summary
         except Exception as e:
@@ -476,17 +614,14 @@ class AIProcessor:
     # Retry wrapper
     # ------------------------------------------------------------------
 
-    async def _process_with_retry(self, func, *args, **kwargs):
-        for attempt in range(self.config.max_retries):
-            try:
-                # Wrap synchronous API calls inside a thread pool to avoid blocking the event loop
-                return await asyncio.to_thread(func, *args, **kwargs)
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1}/{self.config.max_retries} failed: {e}")
-                if attempt < self.config.max_retries - 1:
-                    await asyncio.sleep(self.config.retry_delay)
-                else:
-                    raise
+    async def _process_with_retry(self, func, tokens: float = 0):
+        """Await ``func()`` through the provider's rate controller.
+
+        Native async clients: an in-flight request holds a pooled connection,
+        not an OS thread. Retries, backoff and the concurrency limit are
+        handled by ``self.rate``.
+        """
+        return await self.rate.call(func, tokens=tokens)
 
 
 # ---------------------------------------------------------------------------
@@ -494,95 +629,225 @@ class AIProcessor:
 # ---------------------------------------------------------------------------
 
 
+_IMAGE_PATTERN = r"!\[(?P<alt>[^\]]*)\]\((?P<path>[^)]+)\)"
+_TABLE_PATTERN = r"(?P<table>\|[^\n]+\|\n\|[-:\|\s]+\|\n(?:\|[^\n]+\|\n)+)"
+
+
+@dataclass
+class MarkdownSpan:
+    """An image reference or table found in the source markdown."""
+
+    kind: str  # "image" or "table"
+    start: int
+    end: int
+    match: re.Match
+
+
+def tokenize_markdown(content: str, images: bool = True, tables: bool = True) -> list[MarkdownSpan]:
+    """Return image and table spans of *content* in document order, in a single scan.
+
+    Spans never overlap: an image reference inside a table row belongs to the
+    table span.
+    """
+    patterns = []
+    if images:
+        patterns.append(_IMAGE_PATTERN)
+    if tables:
+        patterns.append(_TABLE_PATTERN)
+    if not patterns:
+        return []
+    return [
+        MarkdownSpan(
+            "table" if match.lastgroup == "table" else "image",
+            match.start(),
+            match.end(),
+            match,
+        )
+        for match in re.finditer("|".join(patterns), content)
+    ]
+
+
+def _new_file_mode(path: Path) -> int:
+    """Mode *path* keeps if it exists, otherwise what ``open()`` would give under the umask."""
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _write_atomic(path: Path, pieces: list[str]) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.writelines(pieces)
+        # mkstemp creates the file with mode 0600.
+        os.chmod(tmp_name, _new_file_mode(path))
+        os.replace(tmp_name, path)
+    except Exception:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
 async def process_markdown(config: ProcessorConfig) -> Path:
-    """Process a markdown file – generate image/table descriptions via AI asynchronously."""
+    """Process a markdown file – generate image/table descriptions via AI asynchronously.
+
+    The file is tokenized once, image and table jobs share one concurrency
+    limit, and the output is assembled by splicing each result at its span's
+    offsets, so every occurrence is rewritten independently and the work is
+    linear in the file size. The result is written atomically.
+    """
     start = time.time()
     logger.info(f"Starting markdown processing [{config.ai_provider.value}]")
 
     input_path = Path(config.input_path)
-    output_dir = Path(config.output_dir)
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
 
     ai_processor = AIProcessor(config)
-    semaphore = asyncio.Semaphore(config.max_concurrency)
+    try:
+        return await _process_markdown(config, ai_processor, start)
+    finally:
+        await ai_processor.aclose()
 
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
 
-    backup_path = create_backup(input_path)
-    output_dir.mkdir(parents=True, exist_ok=True)
+async def _process_markdown(
+    config: ProcessorConfig, ai_processor: AIProcessor, start: float
+) -> Path:
+    """The body of ``process_markdown``; the caller owns and closes *ai_processor*."""
+    input_path = Path(config.input_path)
+    output_dir = Path(config.output_dir)
+    semaphore = asyncio.Semaphore(config.max_concurrency)
 
+    create_backup(input_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
     processed_path = output_dir / f"{input_path.stem}_processed{input_path.suffix}"
-    shutil.copy2(backup_path, processed_path)
 
-    with open(processed_path, encoding="utf-8") as f:
+    with open(input_path, encoding="utf-8") as f:
         content = f.read()
 
-    # ---- images ----
-    if config.image_descriptions:
-        img_pattern = r"!\[([^\]]*)\]\(([^)]+)\)"
-        matches = list(re.finditer(img_pattern, content))
-        logger.info(f"Found {len(matches)} images")
-
-        async def _replace_image_match(match):
-            async with semaphore:
-                alt_text, image_path = match.groups()
-                decoded = urllib.parse.unquote(image_path)
-                try:
-                    root = input_path.parent.resolve()
-                    full = (root / decoded).resolve()
-                    full.relative_to(root)
-                except (ValueError, OSError):
-                    logger.warning(f"Blocked path traversal attempt: {image_path}")
-                    return match.group(0), "[Image skipped: path outside document directory]"
-
-                if full.exists():
-                    desc = await ai_processor.process_image(str(full))
-                    if config.remove_images:
-                        return match.group(0), f"\n\n**Image Description:** {desc}\n\n"
-                    return (
-                        match.group(0),
-                        f"![{alt_text}]({image_path})\n\n**Image Description:** {desc}\n\n",
-                    )
-
-                logger.warning(f"Image not found: {image_path}")
-                return match.group(0), f"[Image not found: {image_path}]"
-
-        tasks = [_replace_image_match(m) for m in matches]
-        results = await asyncio.gather(*tasks)
-
-        for original_str, new_str in results:
-            content = content.replace(original_str, new_str)
-
-        img_count = len(matches)
-    else:
-        img_count = 0
-
-    # ---- tables ----
-    if config.table_descriptions:
-        table_pattern = r"(\|[^\n]+\|\n\|[-:\|\s]+\|\n(?:\|[^\n]+\|\n)+)"
-        matches = list(re.finditer(table_pattern, content))
-        logger.info(f"Found {len(matches)} tables")
-
-        async def _replace_table_match(match):
-            async with semaphore:
-                table_content = match.group(1)
-                summary = await ai_processor.process_table(table_content)
-                if config.remove_tables:
-                    return match.group(0), f"\n\n**Table Summary:** {summary}\n\n"
-                return match.group(0), f"{table_content}\n\n**Table Summary:** {summary}\n\n"
-
-        tasks = [_replace_table_match(m) for m in matches]
-        results = await asyncio.gather(*tasks)
-
-        for original_str, new_str in results:
-            content = content.replace(original_str, new_str)
-
-        table_count = len(matches)
-    else:
-        table_count = 0
-
-    with open(processed_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    spans = tokenize_markdown(content, config.image_descriptions, config.table_descriptions)
+    img_count = sum(span.kind == "image" for span in spans)
+    table_count = len(spans) - img_count
+    logger.info(f"Found {img_count} images and {table_count} tables")
+    root = input_path.parent.resolve()
+
+    def _image_file(image_path: str) -> Path | None:
+        """Resolve a reference, or ``None`` if it points outside the document directory."""
+        try:
+            full = (root / urllib.parse.unquote(image_path)).resolve()
+            full.relative_to(root)
+        except (ValueError, OSError):
+            return None
+        return full
+
+    # Near-identical images share one description call through their group's
+    # representative. If that call fails, each member is described on its own.
+    representatives: dict[Path, Path] | None = None
+    if config.image_dedupe and img_count:
+        from .image_dedupe import group_similar
+
+        files = [
+            full
+            for span in spans
+            if span.kind == "image"
+            and (full := _image_file(span.match.group("path"))) is not None
+            and full.exists()
+        ]
+        representatives = await asyncio.to_thread(
+            group_similar, files, config.image_dedupe_distance
+        )
+    image_calls: dict[Path, asyncio.Future[str]] = {}
+    image_requests = 0
+    image_fallbacks = 0
+
+    async def _limited_image(path: Path) -> str:
+        async with semaphore:
+            return await ai_processor.process_image(str(path))
+
+    async def _shared_image(path: Path) -> str:
+        async with semaphore:
+            return await ai_processor.describe_image(str(path))
+
+    async def _image_description(full: Path) -> str:
+        nonlocal image_requests, image_fallbacks
+        image_requests += 1
+        if representatives is None:
+            return await _limited_image(full)
+        representative = representatives.get(full, full)
+        call = image_calls.get(representative)
+        if call is None:
+            call = image_calls[representative] = asyncio.ensure_future(
+                _shared_image(representative)
+            )
+        try:
+            return await call
+        except Exception as e:
+            if representative == full:
+                logger.error(f"Failed to process image {full}: {e}")
+                return f"[Image processing failed: {full}]"
+        image_fallbacks += 1
+        logger.info(f"Describing {full} on its own; its group representative failed")
+        return await _limited_image(full)
+
+    async def _describe_image(match: re.Match) -> str:
+        alt_text, image_path = match.group("alt", "path")
+        full = _image_file(image_path)
+        if full is None:
+            logger.warning(f"Blocked path traversal attempt: {image_path}")
+            return "[Image skipped: path outside document directory]"
+
+        if not full.exists():
+            logger.warning(f"Image not found: {image_path}")
+            return f"[Image not found: {image_path}]"
+
+        desc = await _image_description(full)
+        if config.remove_images:
+            return f"\n\n**Image Description:** {desc}\n\n"
+        return f"![{alt_text}]({image_path})\n\n**Image Description:** {desc}\n\n"
+
+    async def _describe_table(match: re.Match) -> str:
+        table_content = match.group("table")
+        summary = await ai_processor.process_table(table_content)
+        if config.remove_tables:
+            return f"\n\n**Table Summary:** {summary}\n\n"
+        return f"{table_content}\n\n**Table Summary:** {summary}\n\n"
+
+    async def _replace(span: MarkdownSpan) -> str:
+        if span.kind == "image":
+            return await _describe_image(span.match)
+        async with semaphore:
+            return await _describe_table(span.match)
+
+    replacements = await asyncio.gather(*(_replace(span) for span in spans))
+    if ai_processor.cache is not None:
+        report = ai_processor.cache.report()
+        logger.info(
+            f"Description cache: {report['hits']} hits, {report['coalesced']} coalesced, "
+            f"{report['misses']} misses (hit rate {report['hit_rate']:.0%})"
+        )
+    rate = ai_processor.rate.report()
+    logger.info(
+        f"Provider rate: {rate['effective_requests_per_minute']} requests/min, "
+        f"{rate['retries']} retries, {rate['throttled']} throttled, "
+        f"concurrency limit {rate['concurrency_limit']} (min {rate['min_concurrency_limit']})"
+    )
+    if representatives is not None:
+        logger.info(
+            f"Image dedupe: {len(image_calls) + image_fallbacks} description call(s) for "
+            f"{image_requests} image(s), {image_requests - len(image_calls) - image_fallbacks} "
+            "collapsed"
+        )
+
+    pieces = []
+    offset = 0
+    for span, replacement in zip(spans, replacements, strict=True):
+        pieces.append(content[offset : span.start])
+        pieces.append(replacement)
+        offset = span.end
+    pieces.append(content[offset:])
+    _write_atomic(processed_path, pieces)
 
     elapsed = time.time() - start
     logger.info(
@@ -1,25 +1,165 @@
 import logging
+import threading
 import time
+from collections.abc import Callable
 from pathlib import Path
 
 from .config import MarkDropConfig
-from .conversion.pipeline import convert_document
+from .conversion.assets import (
+    AssetWriter,
+    EmbeddedImages,
+    PageRasterizer,
+    embedded_images,
+    page_rasterizer,
+    renders_crops_from_pdf,
+)
+from .conversion.cache import StageCache, package_version, stage_key
+from .conversion.converter import MarkdropConverter
+from .conversion.profiles import docling_profile
 from .conversion.types import ConversionResult, DoclingConversionResult
 from .process_tables import add_downloadable_tables
 
 logger = logging.getLogger(__name__)
 
 
-def _convert_with_docling(
-    input_doc_path: str,
-    output_dir: Path,
-    config: MarkDropConfig,
-) -> DoclingConversionResult:
-    from docling.datamodel.base_models import InputFormat
-    from docling.datamodel.pipeline_options import PdfPipelineOptions
-    from docling.document_converter import DocumentConverter, PdfFormatOption
-    from docling_core.types.doc import ImageRefMode, PictureItem, TableItem
+def _docling_pipeline_options(config: MarkDropConfig):
+    from docling.datamodel.pipeline_options import (
+        AcceleratorOptions,
+        PdfPipelineOptions,
+        TableFormerMode,
+    )
+
+    profile = docling_profile(config)
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.images_scale = config.image_resolution_scale
+    pipeline_options.do_ocr = profile.do_ocr
+    pipeline_options.ocr_options.force_full_page_ocr = profile.force_full_page_ocr
+    pipeline_options.do_table_structure = profile.do_table_structure
+    pipeline_options.table_structure_options.mode = TableFormerMode(profile.table_mode)
+    pipeline_options.table_structure_options.do_cell_matching = profile.do_cell_matching
+    threads = profile.threads()
+    if threads is not None:
+        pipeline_options.accelerator_options = AcceleratorOptions(num_threads=threads)
+    # When crops are rendered from the PDF by a PageRasterizer, the Docling
+    # document keeps no bitmaps.
+    from_pdf = renders_crops_from_pdf(config)
+    pipeline_options.generate_page_images = not from_pdf
+    pipeline_options.generate_picture_images = not from_pdf
+    return pipeline_options
+
+
+def _docling_cache_parts(config: MarkDropConfig) -> list[str]:
+    """Everything besides the PDF and page range that changes Docling's output.
+
+    Accelerator options only affect speed, and "every CPU" differs between
+    machines, so they are left out.
+    """
+    options = _docling_pipeline_options(config)
+    return [options.model_dump_json(exclude={"accelerator_options"}), package_version("docling")]
+
+
+def effective_docling_options(config: MarkDropConfig) -> dict:
+    """The profile and resolved Docling options a conversion with *config* uses."""
+    import json
+
+    profile = docling_profile(config)
+    return {
+        "name": profile.name,
+        "page_batch_size": profile.page_batch_size,
+        "docling_version": package_version("docling"),
+        "pipeline_options": json.loads(_docling_pipeline_options(config).model_dump_json()),
+    }
+
+
+# Docling reads its page batch size from process-wide settings, so every
+# conversion in the process sets, uses and restores it under this one lock.
+_DOCLING_SETTINGS_LOCK = threading.Lock()
+
+
+class _SerializedConverter:
+    """Docling converter shared across threads; conversions in a process run one at a time.
+
+    Each conversion holds ``_DOCLING_SETTINGS_LOCK`` while Docling's page batch
+    size is set to this converter's profile value, so converters with
+    different profiles never see each other's setting.
+    """
+
+    def __init__(self, converter, page_batch_size: int = 4):
+        self.converter = converter
+        self.page_batch_size = page_batch_size
+
+    def convert(self, *args, **kwargs):
+        from docling.datamodel.settings import settings
+
+        with _DOCLING_SETTINGS_LOCK:
+            previous = settings.perf.page_batch_size
+            settings.perf.page_batch_size = self.page_batch_size
+            try:
+                return self.converter.convert(*args, **kwargs)
+            finally:
+                settings.perf.page_batch_size = previous
+
+
+class DoclingConverterCache:
+    """Initialised Docling converters keyed by their effective pipeline options."""
+
+    def __init__(self):
+        self._converters: dict[str, _SerializedConverter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, config: MarkDropConfig) -> _SerializedConverter:
+        from docling.datamodel.base_models import InputFormat
+        from docling.document_converter import DocumentConverter, PdfFormatOption
+
+        pipeline_options = _docling_pipeline_options(config)
+        page_batch_size = docling_profile(config).page_batch_size
+        key = f"{pipeline_options.model_dump_json()}|{page_batch_size}"
+        with self._lock:
+            cached = self._converters.get(key)
+            if cached is None:
+                logger.info("Initialising Docling converter")
+                converter = DocumentConverter(
+                    format_options={
+                        InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+                    }
+                )
+                converter.initialize_pipeline(InputFormat.PDF)
+                cached = self._converters[key] = _SerializedConverter(converter, page_batch_size)
+            return cached
+
+    def factory(
+        self, config: MarkDropConfig, timings: dict[str, float] | None = None
+    ) -> Callable[[], _SerializedConverter]:
+        """Defer ``get(config)`` until a conversion actually needs Docling.
+
+        Stages served from the stage cache never call the factory, so a fully
+        cached run loads no models. The first call's load time is recorded as
+        ``timings["docling_init_seconds"]``.
+        """
+
+        def load() -> _SerializedConverter:
+            init_start = time.time()
+            converter = self.get(config)
+            if timings is not None:
+                timings.setdefault("docling_init_seconds", round(time.time() - init_start, 3))
+            return converter
+
+        return load
 
+    def clear(self) -> None:
+        with self._lock:
+            self._converters.clear()
+
+    def __len__(self) -> int:
+        return len(self._converters)
+
+
+# Process-wide default so plain `convert_document()` calls (and batch workers)
+# load Docling models once per process.
+_SHARED_DOCLING_CONVERTERS = DoclingConverterCache()
+
+
+def _prepare_output_dirs(output_dir: Path, config: MarkDropConfig) -> tuple[Path, Path]:
     tables_dir = output_dir / "tables"
     images_dir = output_dir / "images"
     excel_dir = output_dir / config.excel_dir
@@ -28,49 +168,107 @@ def _convert_with_docling(
         directory.mkdir(parents=True, exist_ok=True)
         logger.info("Created directory: %s", directory)
 
-    pipeline_options = PdfPipelineOptions()
-    pipeline_options.images_scale = config.image_resolution_scale
-    pipeline_options.generate_page_images = True
-    pipeline_options.generate_picture_images = True
+    return tables_dir, images_dir
 
-    doc_converter = DocumentConverter(
-        format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
-    )
 
-    logger.info("Starting docling conversion of %s", input_doc_path)
-    conv_res = doc_converter.convert(input_doc_path)
-    doc_filename = conv_res.input.file.stem
+def _export_element_images(
+    document,
+    writer: AssetWriter,
+    tables_dir: Path,
+    images_dir: Path,
+    doc_filename: str,
+    table_counter: int = 0,
+    picture_counter: int = 0,
+    page_no: int | None = None,
+    rasterizer: PageRasterizer | None = None,
+    embedded: EmbeddedImages | None = None,
+) -> tuple[int, int]:
+    """Queue every table and picture crop on *writer*, continuing the given counters.
 
-    table_counter = picture_counter = 0
+    Numbers are assigned here in document order, so file names do not depend
+    on which writer thread finishes first. With ``page_no`` only that page's
+    elements are exported. With a ``rasterizer`` crops are rendered from the
+    PDF, and each picture crop is attached to its ``PictureItem`` so Docling's
+    markdown and HTML still reference it. With ``embedded``, a picture that is
+    one embedded bitmap is written from its original stream instead. Each
+    crop's page, DPI and source are recorded in ``writer.assets``.
+    """
+    from io import BytesIO
 
-    for element, _level in conv_res.document.iterate_items():
+    from docling_core.types.doc import ImageRef, PictureItem, TableItem
+    from PIL import Image
+
+    from .conversion.reconcile import _docling_bbox
+
+    def render(element, kind: str):
+        prov = element.prov[0] if element.prov else None
+        record = {"kind": kind, "page": prov.page_no if prov else None}
+        bbox = _docling_bbox(document, prov) if prov else None
+        if rasterizer is None or bbox is None:
+            page = document.pages.get(record["page"])
+            page_image = getattr(page, "image", None)
+            record.update(dpi=getattr(page_image, "dpi", None), source="docling")
+            return element.get_image(document), record
+        image, dpi, source = rasterizer.render(prov.page_no, bbox)
+        record.update(dpi=dpi, source=source)
+        return image, record
+
+    def extract(element):
+        prov = element.prov[0] if element.prov else None
+        bbox = _docling_bbox(document, prov) if prov else None
+        found = embedded.extract(prov.page_no, bbox) if bbox is not None else None
+        if found is None:
+            return None
+        data, extension, dpi = found
+        if rasterizer is not None:
+            # Docling kept no picture images; attach the decoded stream for its references.
+            try:
+                with Image.open(BytesIO(data)) as image:
+                    element.image = ImageRef.from_pil(image.convert("RGB"), dpi=dpi)
+            except Exception as exc:
+                logger.debug("Rendering picture instead of embedded stream: %s", exc)
+                return None
+        record = {"kind": "picture", "page": prov.page_no, "dpi": dpi, "source": "embedded"}
+        return data, extension, record
+
+    extension = writer.extension
+    for element, _level in document.iterate_items(page_no=page_no):
         try:
             if isinstance(element, TableItem):
                 table_counter += 1
-                element_image_filename = tables_dir / f"{doc_filename}-table-{table_counter}.png"
-                with element_image_filename.open("wb") as fp:
-                    element.get_image(conv_res.document).save(fp, "PNG")
-                logger.debug("Saved table %s", table_counter)
+                image, record = render(element, "table")
+                writer.submit(
+                    image,
+                    tables_dir / f"{doc_filename}-table-{table_counter}.{extension}",
+                    record,
+                )
+                logger.debug("Queued table %s", table_counter)
 
             if isinstance(element, PictureItem):
                 picture_counter += 1
-                element_image_filename = (
-                    images_dir / f"{doc_filename}-picture-{picture_counter}.png"
+                found = extract(element) if embedded is not None else None
+                if found is not None:
+                    data, stream_extension, record = found
+                    name = f"{doc_filename}-picture-{picture_counter}.{stream_extension}"
+                    writer.submit_bytes(data, images_dir / name, record)
+                    logger.debug("Queued embedded picture %s", picture_counter)
+                    continue
+                image, record = render(element, "picture")
+                if record["source"] != "docling" and image is not None:
+                    element.image = ImageRef.from_pil(image, dpi=record["dpi"])
+                writer.submit(
+                    image,
+                    images_dir / f"{doc_filename}-picture-{picture_counter}.{extension}",
+                    record,
                 )
-                with element_image_filename.open("wb") as fp:
-                    element.get_image(conv_res.document).save(fp, "PNG")
-                logger.debug("Saved picture %s", picture_counter)
+                logger.debug("Queued picture %s", picture_counter)
         except Exception as e:
             logger.error("Error processing element: %s", e)
 
-    md_filename = output_dir / f"{doc_filename}-markdroped.md"
-    html_filename = output_dir / f"{doc_filename}-markdroped.html"
+    return table_counter, picture_counter
 
-    conv_res.document.save_as_markdown(md_filename, image_mode=ImageRefMode.REFERENCED)
-    conv_res.document.save_as_html(html_filename, image_mode=ImageRefMode.REFERENCED)
-
-    logger.info("Saved markdown and HTML files")
 
+def _brand_html(html_filename: Path) -> None:
     with open(html_filename, encoding="utf-8") as file:
         html_content = file.read()
 
@@ -88,6 +286,95 @@ def _convert_with_docling(
     with open(html_filename, "w", encoding="utf-8") as file:
         file.write(html_content)
 
+
+def _docling_document(
+    converter_factory: Callable[[], _SerializedConverter],
+    input_doc_path: str,
+    config: MarkDropConfig,
+    page_range: tuple[int, int] | None,
+    stage_cache: StageCache | None = None,
+    pdf_digest: str | None = None,
+):
+    """Return ``(document, conv_res)``, loading the document from *stage_cache* if present.
+
+    ``conv_res`` is ``None`` on a cache hit; *converter_factory* is only
+    called on a miss.
+    """
+    cache_key = label = None
+    if stage_cache is not None:
+        from docling_core.types.doc import DoclingDocument
+
+        cache_key = stage_key(pdf_digest, "docling", page_range, *_docling_cache_parts(config))
+        label = f"docling[{page_range[0]}-{page_range[1]}]" if page_range else "docling"
+        cached = stage_cache.get("docling", cache_key, label=label)
+        if cached is not None:
+            logger.info("Loaded docling document for %s from stage cache", input_doc_path)
+            return DoclingDocument.model_validate(cached), None
+
+    doc_converter = converter_factory()
+    if page_range:
+        logger.info("Starting docling conversion of %s pages %s-%s", input_doc_path, *page_range)
+        conv_res = doc_converter.convert(input_doc_path, page_range=page_range)
+    else:
+        logger.info("Starting docling conversion of %s", input_doc_path)
+        conv_res = doc_converter.convert(input_doc_path)
+
+    if stage_cache is not None:
+        try:
+            stage_cache.put("docling", cache_key, conv_res.document.export_to_dict())
+        except Exception as exc:
+            logger.warning("Could not write docling stage to cache: %s", exc)
+    return conv_res.document, conv_res
+
+
+def _convert_with_docling(
+    input_doc_path: str,
+    output_dir: Path,
+    config: MarkDropConfig,
+    page_range: tuple[int, int] | None = None,
+    converter_factory: Callable[[], _SerializedConverter] | None = None,
+    stage_cache: StageCache | None = None,
+    pdf_digest: str | None = None,
+) -> DoclingConversionResult:
+    from docling_core.types.doc import ImageRefMode
+
+    from .conversion.blocks import BlockTable
+    from .conversion.reconcile import iter_docling_document_blocks
+
+    tables_dir, images_dir = _prepare_output_dirs(output_dir, config)
+    if converter_factory is None:
+        converter_factory = _SHARED_DOCLING_CONVERTERS.factory(config)
+
+    document, conv_res = _docling_document(
+        converter_factory, input_doc_path, config, page_range, stage_cache, pdf_digest
+    )
+    doc_filename = Path(input_doc_path).stem
+
+    with (
+        AssetWriter(config) as writer,
+        page_rasterizer(input_doc_path, config) as rasterizer,
+        embedded_images(input_doc_path, config) as embedded,
+    ):
+        table_counter, picture_counter = _export_element_images(
+            document,
+            writer,
+            tables_dir,
+            images_dir,
+            doc_filename,
+            rasterizer=rasterizer,
+            embedded=embedded,
+        )
+
+    md_filename = output_dir / f"{doc_filename}-markdroped.md"
+    html_filename = output_dir / f"{doc_filename}-markdroped.html"
+
+    document.save_as_markdown(md_filename, image_mode=ImageRefMode.REFERENCED)
+    document.save_as_html(html_filename, image_mode=ImageRefMode.REFERENCED)
+
+    logger.info("Saved markdown and HTML files")
+
+    _brand_html(html_filename)
+
     return DoclingConversionResult(
         doc_filename=doc_filename,
         md_path=md_filename,
@@ -97,10 +384,220 @@ def _convert_with_docling(
         images_dir=images_dir,
         table_counter=table_counter,
         picture_counter=picture_counter,
+        docling_blocks=BlockTable.from_blocks(iter_docling_document_blocks(document)),
+        assets=writer.assets,
     )
 
 
-def markdrop(input_doc_path: str, output_dir: str, config: MarkDropConfig | None = None) -> Path:
+def _html_body(html_content: str) -> str:
+    start = html_content.find("<body>")
+    end = html_content.rfind("</body>")
+    if start == -1 or end == -1:
+        return html_content
+    return html_content[start + len("<body>") : end]
+
+
+def _convert_with_docling_windowed(
+    input_doc_path: str,
+    output_dir: Path,
+    config: MarkDropConfig,
+    windows: list[tuple[int, int]],
+    converter_factory: Callable[[], _SerializedConverter] | None = None,
+    stage_cache: StageCache | None = None,
+    pdf_digest: str | None = None,
+) -> DoclingConversionResult:
+    """Convert one page window at a time so only a single window's pages are held.
+
+    Each window's tables and pictures are exported, its markdown and HTML body
+    are appended to the document outputs, and its Docling blocks are kept
+    (text only) before the window's conversion result is released.
+    """
+    from docling_core.types.doc import ImageRefMode
+
+    from .conversion.blocks import BlockTableBuilder
+    from .conversion.reconcile import iter_docling_document_blocks
+
+    tables_dir, images_dir = _prepare_output_dirs(output_dir, config)
+    if converter_factory is None:
+        converter_factory = _SHARED_DOCLING_CONVERTERS.factory(config)
+
+    doc_filename = Path(input_doc_path).stem
+    md_filename = output_dir / f"{doc_filename}-markdroped.md"
+    html_filename = output_dir / f"{doc_filename}-markdroped.html"
+    artifacts_dir = md_filename.with_name(f"{md_filename.stem}_artifacts")
+    window_md = output_dir / f".{doc_filename}-window.md"
+    window_html = output_dir / f".{doc_filename}-window.html"
+
+    table_counter = picture_counter = 0
+    docling_blocks = BlockTableBuilder()
+
+    with (
+        md_filename.open("w", encoding="utf-8") as md_handle,
+        html_filename.open("w", encoding="utf-8") as html_handle,
+        AssetWriter(config) as writer,
+        page_rasterizer(input_doc_path, config) as rasterizer,
+        embedded_images(input_doc_path, config) as embedded,
+    ):
+        for index, (first, last) in enumerate(windows):
+            document, _conv_res = _docling_document(
+                converter_factory, input_doc_path, config, (first, last), stage_cache, pdf_digest
+            )
+
+            table_counter, picture_counter = _export_element_images(
+                document,
+                writer,
+                tables_dir,
+                images_dir,
+                doc_filename,
+                table_counter,
+                picture_counter,
+                rasterizer=rasterizer,
+                embedded=embedded,
+            )
+            docling_blocks.extend(iter_docling_document_blocks(document))
+
+            document.save_as_markdown(
+                window_md, artifacts_dir=artifacts_dir, image_mode=ImageRefMode.REFERENCED
+            )
+            document.save_as_html(
+                window_html, artifacts_dir=artifacts_dir, image_mode=ImageRefMode.REFERENCED
+            )
+            del document, _conv_res
+
+            if index:
+                md_handle.write("\n\n")
+            md_handle.write(window_md.read_text(encoding="utf-8").strip("\n"))
+
+            html_content = window_html.read_text(encoding="utf-8")
+            if index == 0:
+                html_handle.write(html_content[: html_content.rfind("</body>")])
+            else:
+                html_handle.write(_html_body(html_content))
+
+        md_handle.write("\n")
+        html_handle.write("</body>\n</html>\n")
+
+    window_md.unlink(missing_ok=True)
+    window_html.unlink(missing_ok=True)
+    logger.info("Saved markdown and HTML files from %s windows", len(windows))
+
+    _brand_html(html_filename)
+
+    return DoclingConversionResult(
+        doc_filename=doc_filename,
+        md_path=md_filename,
+        html_path=html_filename,
+        conv_res=None,
+        tables_dir=tables_dir,
+        images_dir=images_dir,
+        table_counter=table_counter,
+        picture_counter=picture_counter,
+        docling_blocks=docling_blocks.build(),
+        assets=writer.assets,
+    )
+
+
+def _convert_pages_with_docling(
+    input_doc_path: str,
+    output_dir: Path,
+    config: MarkDropConfig,
+    runs: list[tuple[int, int]],
+    converter_factory: Callable[[], _SerializedConverter] | None = None,
+    stage_cache: StageCache | None = None,
+    pdf_digest: str | None = None,
+) -> tuple[dict[int, dict], str | None]:
+    """Convert page runs and split each run's output into per-page fragments.
+
+    Returns ``(fragments, html_head)``. Each fragment holds a page's markdown,
+    HTML body, Docling blocks, crop counts and asset records. Crops are named
+    ``<doc>-page-<n>-table-<k>.<ext>``, with the extension of
+    ``config.asset_format``, so that later runs can keep or move them page by
+    page.
+    """
+    from docling_core.types.doc import ImageRefMode
+
+    from .conversion.blocks import BlockTable
+    from .conversion.reconcile import iter_docling_document_blocks
+
+    tables_dir, images_dir = _prepare_output_dirs(output_dir, config)
+    if converter_factory is None:
+        converter_factory = _SHARED_DOCLING_CONVERTERS.factory(config)
+
+    doc_filename = Path(input_doc_path).stem
+    md_filename = output_dir / f"{doc_filename}-markdroped.md"
+    artifacts_dir = md_filename.with_name(f"{md_filename.stem}_artifacts")
+    page_md = output_dir / f".{doc_filename}-page.md"
+    page_html = output_dir / f".{doc_filename}-page.html"
+
+    fragments: dict[int, dict] = {}
+    asset_marks: dict[int, tuple[int, int]] = {}
+    html_head = None
+    with (
+        AssetWriter(config) as writer,
+        page_rasterizer(input_doc_path, config) as rasterizer,
+        embedded_images(input_doc_path, config) as embedded,
+    ):
+        for first, last in runs:
+            document, _conv_res = _docling_document(
+                converter_factory, input_doc_path, config, (first, last), stage_cache, pdf_digest
+            )
+            for page_no in range(first, last + 1):
+                first_asset = writer.mark()
+                tables, pictures = _export_element_images(
+                    document,
+                    writer,
+                    tables_dir,
+                    images_dir,
+                    f"{doc_filename}-page-{page_no}",
+                    page_no=page_no,
+                    rasterizer=rasterizer,
+                    embedded=embedded,
+                )
+                asset_marks[page_no] = (first_asset, writer.mark())
+                document.save_as_markdown(
+                    page_md,
+                    artifacts_dir=artifacts_dir,
+                    image_mode=ImageRefMode.REFERENCED,
+                    page_no=page_no,
+                )
+                document.save_as_html(
+                    page_html,
+                    artifacts_dir=artifacts_dir,
+                    image_mode=ImageRefMode.REFERENCED,
+                    page_no=page_no,
+                )
+                html_content = page_html.read_text(encoding="utf-8")
+                body_start = html_content.find("<body>")
+                if html_head is None and body_start != -1:
+                    html_head = html_content[: body_start + len("<body>")]
+
+                fragments[page_no] = {
+                    "markdown": page_md.read_text(encoding="utf-8").strip("\n"),
+                    "html": _html_body(html_content),
+                    "docling_blocks": BlockTable.from_blocks(
+                        iter_docling_document_blocks(document, page_no=page_no)
+                    ),
+                    "tables": tables,
+                    "pictures": pictures,
+                }
+            del document, _conv_res
+
+    # Writes finish when the writer closes; only then is each page's asset list final.
+    for page_no, (start, stop) in asset_marks.items():
+        fragments[page_no]["assets"] = writer.assets_between(start, stop)
+
+    page_md.unlink(missing_ok=True)
+    page_html.unlink(missing_ok=True)
+    logger.info("Converted %s page(s) in %s run(s)", len(fragments), len(runs))
+    return fragments, html_head
+
+
+def markdrop(
+    input_doc_path: str,
+    output_dir: str,
+    config: MarkDropConfig | None = None,
+    page_range: tuple[int, int] | None = None,
+) -> Path:
     """Convert document to markdown and HTML with enhanced features."""
     if config is None:
         config = MarkDropConfig()
@@ -109,7 +606,9 @@ def markdrop(input_doc_path: str, output_dir: str, config: MarkDropConfig | None
     logger.info("Starting conversion of %s", input_doc_path)
 
     try:
-        result: ConversionResult = convert_document(input_doc_path, output_dir, config)
+        result: ConversionResult = MarkdropConverter(config).convert(
+            input_doc_path, output_dir, page_range=page_range
+        )
         elapsed = time.time() - start_time
         logger.info("Document converted and figures exported in %.2f seconds", elapsed)
         return result.html_path
@@ -120,6 +619,7 @@ def markdrop(input_doc_path: str, output_dir: str, config: MarkDropConfig | None
 
 __all__ = [
     "MarkDropConfig",
+    "MarkdropConverter",
     "markdrop",
     "add_downloadable_tables",
     "ConversionResult",
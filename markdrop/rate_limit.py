@@ -0,0 +1,238 @@
+"""Adaptive, 429-aware rate control for AI provider calls.
+
+A ``RateController`` sits in front of one provider's requests. It combines
+token buckets for requests and tokens per minute with an AIMD concurrency
+limit: each success raises the limit by ``1 / limit``, and a 429 or 5xx
+response halves it. Failed calls are retried with full-jitter exponential
+backoff, or after the server's ``Retry-After`` delay, which also pauses new
+requests so that retries do not arrive together. Errors that cannot succeed
+on retry, such as authentication or validation failures, are raised at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses worth retrying besides 5xx: timeout, conflict, too early, rate limited.
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429})
+# Token buckets hold this many seconds of their per-minute rate.
+_BURST_SECONDS = 10.0
+# Concurrent 429s within this window halve the limit once.
+_DECREASE_WINDOW = 1.0
+
+
+class TokenBucket:
+    """Refills at ``per_minute / 60`` units per second, holding at most a short burst."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * _BURST_SECONDS, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A request larger than the bucket would never fit; let it drain the bucket.
+        amount = min(amount, self.capacity)
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return
+            await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+def error_status(exc: BaseException) -> int | None:
+    """The HTTP status carried by a provider SDK exception, if any."""
+    for attr in ("status_code", "status", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    value = getattr(getattr(exc, "response", None), "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds from the ``Retry-After`` (or ``retry-after-ms``) header of *exc*'s response."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES or status >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    # SDK transport errors (APIConnectionError, APITimeoutError, httpx.ConnectError, ...)
+    name = type(exc).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+class RateController:
+    """Rate and concurrency control with retries for one provider.
+
+    ``requests_per_minute`` and ``tokens_per_minute`` of ``0`` disable the
+    corresponding bucket. The concurrency limit moves between 1 and
+    ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+    ):
+        self.max_limit = max(max_concurrency, 1)
+        self.limit = float(self.max_limit)
+        self.min_limit_seen = self.max_limit
+        self.max_retries = max(max_retries, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._resume_at = 0.0
+        self._last_decrease = 0.0
+        self._started: float | None = None
+        self._finished = 0.0
+        self.attempts = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.throttled = 0
+
+    async def _enter(self, tokens: float) -> None:
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._requests is not None:
+            await self._requests.acquire()
+        if self._tokens is not None:
+            await self._tokens.acquire(tokens)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        self.attempts += 1
+        if self._started is None:
+            self._started = time.monotonic()
+
+    async def _exit(self, success: bool, overloaded: bool) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if overloaded and now - self._last_decrease > _DECREASE_WINDOW:
+                self.limit = max(1.0, self.limit / 2)
+                self._last_decrease = now
+                self.min_limit_seen = min(self.min_limit_seen, int(self.limit))
+                logger.info("Provider overloaded; concurrency limit now %s", int(self.limit))
+            elif success:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float | None:
+        """Seconds to wait before the next attempt, or ``None`` to give up.
+
+        A ``Retry-After`` is honoured in full (plus up to 10% jitter); one
+        longer than ``max_delay`` gives up, since any earlier retry would be
+        rejected again.
+        """
+        server_delay = retry_after(exc)
+        if server_delay is not None:
+            if server_delay > self.max_delay:
+                logger.warning(
+                    "Server asked to retry after %.0fs, beyond max_retry_delay of %.0fs",
+                    server_delay,
+                    self.max_delay,
+                )
+                return None
+            delay = server_delay * random.uniform(1.0, 1.1)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            return delay
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def call(self, func: Callable[[], Awaitable[T]], tokens: float = 0) -> T:
+        """Await ``func()`` under the limits, retrying failures that may succeed later.
+
+        *tokens* is the estimated size of the request for the tokens-per-minute
+        bucket; it is charged again on every attempt.
+        """
+        attempt = 0
+        while True:
+            await self._enter(tokens)
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                await self._exit(success=False, overloaded=False)
+                raise
+            except Exception as exc:
+                status = error_status(exc)
+                overloaded = status is not None and (status == 429 or status >= 500)
+                if status == 429:
+                    self.throttled += 1
+                await self._exit(success=False, overloaded=overloaded)
+                delay = None
+                if is_retryable(exc) and attempt + 1 < self.max_retries:
+                    delay = self._backoff(attempt, exc)
+                if delay is None:
+                    self.failed += 1
+                    self._finished = time.monotonic()
+                    raise
+                self.retries += 1
+                logger.warning(
+                    "Attempt %s/%s failed (%s); retrying in %.1fs",
+                    attempt + 1,
+                    self.max_retries,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                await self._exit(success=True, overloaded=False)
+                self.succeeded += 1
+                self._finished = time.monotonic()
+                return result
+
+    def report(self) -> dict[str, Any]:
+        elapsed = self._finished - self._started if self._started is not None else 0.0
+        return {
+            "attempts": self.attempts,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "concurrency_limit": int(self.limit),
+            "min_concurrency_limit": self.min_limit_seen,
+            "effective_requests_per_minute": round(self.succeeded * 60 / elapsed, 1)
+            if elapsed > 0
+            else 0.0,
+        }
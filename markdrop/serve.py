@@ -0,0 +1,447 @@
+"""Local HTTP conversion daemon that keeps Docling models warm between requests.
+
+Endpoints
+---------
+    GET  /health   – liveness, version, worker count
+    GET  /queue    – queue depth, running and completed job counts
+    POST /convert  – convert a PDF and return markdown, manifest and asset paths
+
+``POST /convert`` accepts either a JSON body ``{"path": "...", "pages": "1-20"}``
+naming a file under the server's input root (or a URL, if remote inputs are
+allowed), or the raw PDF bytes with ``Content-Type: application/pdf``
+(``?filename=report.pdf&pages=1-20`` optional). The server runs on the
+standard library; each worker converts in its own process because PyMuPDF is
+not thread-safe. No network access is needed beyond the listening socket
+unless remote inputs are enabled.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from . import __version__
+from .config import MarkDropConfig
+from .conversion.converter import MarkdropConverter
+from .conversion.session import parse_page_range
+from .conversion.types import ConversionResult
+from .utils import MAX_PDF_BYTES, PDF_MAGIC, _sanitize_filename, is_remote_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_REQUEST_TIMEOUT = 3600
+DEFAULT_KEEP_JOBS = 100
+QUEUE_FULL_RETRY_AFTER = 5
+
+_JOB_ID = re.compile(r"[0-9a-f]{12}")
+
+# The warm converter of a worker process, created by ``_init_worker``.
+_WORKER_CONVERTER: MarkdropConverter | None = None
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the service cannot accept another job."""
+
+
+@dataclass
+class _Job:
+    job_id: str
+    input_path: str
+    output_dir: Path
+    page_range: tuple[int, int] | None
+    done: threading.Event = field(default_factory=threading.Event)
+    result: ConversionResult | None = None
+    error: Exception | None = None
+
+
+def _init_worker(config: MarkDropConfig, warm: bool) -> None:
+    global _WORKER_CONVERTER
+    _WORKER_CONVERTER = MarkdropConverter(config)
+    if warm:
+        try:
+            _WORKER_CONVERTER.warm_up()
+        except Exception as exc:
+            logger.error("Warm-up failed in worker process %s: %s", os.getpid(), exc)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _convert_in_worker(
+    input_path: str,
+    output_dir: Path,
+    page_range: tuple[int, int] | None,
+) -> ConversionResult:
+    if _WORKER_CONVERTER is None:
+        raise RuntimeError("worker process was not initialised")
+    return _WORKER_CONVERTER.convert(input_path, output_dir, page_range=page_range)
+
+
+class ConversionService:
+    """Bounded job queue drained by worker processes, each with its own warm converter.
+
+    One dispatcher thread per worker hands jobs to a single-process pool, so
+    PyMuPDF and Docling never run on two threads of one process. JSON
+    requests may only name files under ``input_root`` (none when it is
+    ``None``) and URLs only when ``allow_remote`` is set. The directories of
+    the ``keep_jobs`` most recent finished jobs are kept; older ones are
+    deleted (``0`` keeps all).
+    """
+
+    def __init__(
+        self,
+        output_root: str | Path,
+        config: MarkDropConfig | None = None,
+        workers: int = 1,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        warm: bool = True,
+        input_root: str | Path | None = None,
+        allow_remote: bool = False,
+        keep_jobs: int = DEFAULT_KEEP_JOBS,
+    ):
+        self.output_root = Path(output_root)
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        self.config = config if config is not None else MarkDropConfig()
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.input_root = Path(input_root).resolve() if input_root is not None else None
+        self.allow_remote = allow_remote
+        self.keep_jobs = max(0, keep_jobs)
+        self._warm = warm
+        self._queue: queue.Queue[_Job | None] = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        # Job directories left by earlier runs are the oldest candidates for cleanup.
+        self._finished_dirs: deque[Path] = deque(
+            sorted(
+                (
+                    path
+                    for path in self.output_root.iterdir()
+                    if path.is_dir() and _JOB_ID.fullmatch(path.name)
+                ),
+                key=lambda path: path.stat().st_mtime,
+            )
+        )
+        self._prune_jobs()
+        self._ready = threading.Barrier(self.workers + 1)
+        self._threads = [
+            threading.Thread(
+                target=self._worker,
+                name=f"markdrop-convert-{index}",
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._ready.wait()
+
+    def _start_process(self) -> ProcessPoolExecutor:
+        # "spawn" keeps Torch/Docling state out of forked children on every platform.
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.config, self._warm),
+        )
+
+    def _worker(self) -> None:
+        executor = self._start_process()
+        try:
+            # Waits for the process to start and, with warm=True, load its models.
+            executor.submit(_worker_ready).result()
+        except Exception as exc:
+            logger.error("Worker %s failed to start: %s", threading.current_thread().name, exc)
+        self._ready.wait()
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                executor.shutdown()
+                self._queue.task_done()
+                return
+            with self._lock:
+                self._running += 1
+            try:
+                job.result = executor.submit(
+                    _convert_in_worker, job.input_path, job.output_dir, job.page_range
+                ).result()
+            except BrokenProcessPool as exc:
+                logger.error("Job %s failed: worker process died (%s)", job.job_id, exc)
+                job.error = exc
+                executor.shutdown(wait=False)
+                executor = self._start_process()
+            except Exception as exc:
+                logger.error("Job %s failed: %s", job.job_id, exc)
+                job.error = exc
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    if job.error is None:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+                    self._finished_dirs.append(job.output_dir.parent)
+                    self._prune_jobs()
+                job.done.set()
+                self._queue.task_done()
+
+    def _prune_jobs(self) -> None:
+        if not self.keep_jobs:
+            return
+        while len(self._finished_dirs) > self.keep_jobs:
+            shutil.rmtree(self._finished_dirs.popleft(), ignore_errors=True)
+
+    def resolve_input(self, path: str) -> str:
+        """Check a client-supplied input against the access policy and return what to open.
+
+        Raises ``PermissionError`` for inputs the policy forbids and
+        ``ValueError`` for local files that do not exist.
+        """
+        if is_remote_path(path):
+            if not self.allow_remote:
+                raise PermissionError("remote inputs are disabled on this server")
+            return path
+        if self.input_root is None:
+            raise PermissionError("local paths are disabled on this server; upload the PDF")
+        # Absolute paths replace the root here and are then checked like relative ones.
+        resolved = (self.input_root / path).resolve()
+        if not resolved.is_relative_to(self.input_root):
+            raise PermissionError(f"path is outside the input root: {path}")
+        if not resolved.is_file():
+            raise ValueError(f"input file not found: {path}")
+        return str(resolved)
+
+    def new_job_dir(self) -> tuple[str, Path]:
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = self.output_root / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        return job_id, job_dir
+
+    def submit(
+        self,
+        job_id: str,
+        job_dir: Path,
+        input_path: str,
+        page_range: tuple[int, int] | None = None,
+    ) -> _Job:
+        job = _Job(job_id, input_path, job_dir, page_range)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFullError("conversion queue is full") from None
+        return job
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+            }
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = f"markdrop/{__version__}"
+    server: "_Server"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        payload: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(
+        self,
+        status: HTTPStatus,
+        message: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def do_GET(self) -> None:
+        path = urllib.parse.urlparse(self.path).path
+        service = self.server.service
+        if path == "/health":
+            self._send_json(
+                HTTPStatus.OK,
+                {"status": "ok", "version": __version__, "workers": service.workers},
+            )
+        elif path == "/queue":
+            self._send_json(HTTPStatus.OK, service.stats())
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f"unknown endpoint {path}")
+
+    def do_POST(self) -> None:
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path != "/convert":
+            self._error(HTTPStatus.NOT_FOUND, f"unknown endpoint {parsed.path}")
+            return
+
+        params = dict(urllib.parse.parse_qsl(parsed.query))
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._error(HTTPStatus.BAD_REQUEST, "invalid Content-Length header")
+            return
+        if length <= 0:
+            self._error(HTTPStatus.LENGTH_REQUIRED, "request body required")
+            return
+        if length > MAX_PDF_BYTES:
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "upload exceeds size limit")
+            return
+        body = self.rfile.read(length)
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+        service = self.server.service
+        job_id, job_dir = service.new_job_dir()
+        try:
+            if content_type == "application/json":
+                request = json.loads(body)
+                if not isinstance(request, dict):
+                    raise ValueError("JSON body must be an object")
+                input_path = str(request.get("path") or "")
+                pages = request.get("pages") or params.get("pages")
+                if not input_path:
+                    raise ValueError("JSON body must include 'path'")
+                input_path = service.resolve_input(input_path)
+            else:
+                if not body.startswith(PDF_MAGIC):
+                    raise ValueError("request body is not a PDF")
+                filename = _sanitize_filename(params.get("filename") or "upload.pdf")
+                if not filename.lower().endswith(".pdf"):
+                    filename += ".pdf"
+                upload = job_dir / filename
+                upload.write_bytes(body)
+                input_path = str(upload)
+                pages = params.get("pages")
+            page_range = parse_page_range(str(pages)) if pages else None
+        except PermissionError as exc:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            self._error(HTTPStatus.FORBIDDEN, str(exc))
+            return
+        except ValueError as exc:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            self._error(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+
+        start = time.time()
+        try:
+            job = service.submit(job_id, job_dir / "output", input_path, page_range)
+        except QueueFullError as exc:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            self._error(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                str(exc),
+                {"Retry-After": str(QUEUE_FULL_RETRY_AFTER)},
+            )
+            return
+
+        if not job.done.wait(self.server.request_timeout):
+            self._error(HTTPStatus.GATEWAY_TIMEOUT, f"job {job_id} still running")
+            return
+        if job.error is not None or job.result is None:
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"conversion failed: {job.error}")
+            return
+
+        result = job.result
+        self._send_json(
+            HTTPStatus.OK,
+            {
+                "job_id": job_id,
+                "seconds": round(time.time() - start, 3),
+                "markdown": result.markdown_path.read_text(encoding="utf-8"),
+                "markdown_path": str(result.markdown_path.resolve()),
+                "html_path": str(result.html_path.resolve()),
+                "assets_dir": str(result.assets_dir.resolve()),
+                "manifest_path": str((result.assets_dir / "manifest.json").resolve()),
+                "manifest": result.manifest,
+                "warnings": result.warnings,
+            },
+        )
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: ConversionService, timeout: float):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.request_timeout = timeout
+
+
+def serve(
+    output_dir: str | Path,
+    config: MarkDropConfig | None = None,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = 1,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+    request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    warm: bool = True,
+    input_root: str | Path | None = None,
+    allow_remote: bool = False,
+    keep_jobs: int = DEFAULT_KEEP_JOBS,
+) -> None:
+    """Run the conversion daemon until interrupted."""
+    service = ConversionService(
+        output_dir,
+        config,
+        workers=workers,
+        max_queue=max_queue,
+        warm=warm,
+        input_root=input_root,
+        allow_remote=allow_remote,
+        keep_jobs=keep_jobs,
+    )
+    server = _Server((host, port), service, request_timeout)
+    logger.info("markdrop serve listening on http://%s:%s", host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        service.shutdown()
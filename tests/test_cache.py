@@ -0,0 +1,10 @@
+from markdrop.conversion.cache import StageCache
+
+
+def test_oversized_entry_is_skipped_without_evicting(tmp_path):
+    cache = StageCache(tmp_path, max_bytes=4096)
+    cache.put("blocks", "small", {"text": "kept"})
+    cache.put("blocks", "huge", {"text": "x" * 100_000 + "".join(map(str, range(20_000)))})
+
+    assert cache.get("blocks", "huge") is None
+    assert cache.get("blocks", "small") == {"text": "kept"}
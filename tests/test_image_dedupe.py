@@ -0,0 +1,23 @@
+from PIL import Image, ImageDraw
+
+from markdrop.image_dedupe import group_similar
+
+
+def _figure(path, size):
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    draw.rectangle((0, 0, width // 2, height // 2), fill=0)
+    draw.ellipse((width // 2, height // 2, width - 1, height - 1), fill=96)
+    image.save(path)
+    return path
+
+
+def test_group_similar_requires_matching_aspect_ratio(tmp_path):
+    first = _figure(tmp_path / "first.png", (200, 100))
+    rescaled = _figure(tmp_path / "rescaled.png", (300, 150))
+    square = _figure(tmp_path / "square.png", (200, 200))
+
+    groups = group_similar([first, rescaled, square], max_distance=4)
+
+    assert groups == {first: first, rescaled: first, square: square}
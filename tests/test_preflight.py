@@ -0,0 +1,18 @@
+from markdrop.conversion.preflight import EARLY_EXIT_MIN_SAMPLES, _sample_order
+
+
+def test_sample_order_visits_each_page_once():
+    order = _sample_order(300, 32, seed=300)
+    assert len(order) == 32
+    assert len(set(order)) == len(order)
+    assert all(1 <= offset <= 300 for offset in order)
+
+
+def test_early_exit_samples_cover_whole_document():
+    total_pages = 300
+    early = sorted(_sample_order(total_pages, 32, seed=total_pages)[:EARLY_EXIT_MIN_SAMPLES])
+    # Every quarter of the document is sampled before early exit can trigger.
+    quarters = {(offset - 1) * 4 // total_pages for offset in early}
+    assert quarters == {0, 1, 2, 3}
+    gaps = [b - a for a, b in zip(early, early[1:], strict=False)]
+    assert max(gaps) < total_pages // 3
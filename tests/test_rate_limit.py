@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from markdrop.rate_limit import RateController
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def _count_backoffs(monkeypatch):
+    calls = []
+
+    def backoff(self, attempt, exc):
+        calls.append(attempt)
+        return 0.0
+
+    monkeypatch.setattr(RateController, "_backoff", backoff)
+    return calls
+
+
+def test_each_429_reaches_backoff_once(monkeypatch):
+    backoffs = _count_backoffs(monkeypatch)
+    requests = 0
+
+    async def throttled():
+        nonlocal requests
+        requests += 1
+        raise RateLimited("429 Too Many Requests")
+
+    rate = RateController(4, max_retries=3)
+    with pytest.raises(RateLimited):
+        asyncio.run(rate.call(throttled))
+
+    assert requests == rate.attempts == 3
+    assert backoffs == [0, 1]
+    assert rate.throttled == 3
+
+
+def test_openai_client_does_not_retry_behind_rate_controller(monkeypatch):
+    pytest.importorskip("openai")
+    import httpx
+
+    from markdrop.parse import AIProcessor, AIProvider, ProcessorConfig
+
+    backoffs = _count_backoffs(monkeypatch)
+    requests = 0
+
+    def handler(request):
+        nonlocal requests
+        requests += 1
+        return httpx.Response(429, json={"error": {"message": "rate limited"}})
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(
+        AIProcessor,
+        "_http_client",
+        lambda self: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    config = ProcessorConfig(
+        input_path="",
+        output_dir="",
+        ai_provider=AIProvider.OPENAI,
+        max_retries=3,
+        description_cache=False,
+    )
+
+    async def run():
+        processor = AIProcessor(config)
+        try:
+            return await processor.process_table("| a |\n|---|\n| 1 |")
+        finally:
+            await processor.aclose()
+
+    summary = asyncio.run(run())
+
+    assert summary == "[Table processing failed]"
+    assert requests == 3
+    assert backoffs == [0, 1]